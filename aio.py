@@ -0,0 +1,86 @@
+"""
+    asyncio adapters for the Cassandra driver.
+
+    ``wrap_future`` turns a driver ``ResponseFuture``, whose callbacks run on
+    the driver's event loop thread, into an asyncio future resolved on the
+    caller's loop, fetching every page of the result first. ``AsyncFanout``
+    is the coroutine counterpart of ``FanoutExecutor``: it runs the queries
+    of a request concurrently with at most ``max_per_request`` of them and
+    ``max_per_process`` overall in flight, without holding a thread while
+    they wait on Cassandra.
+"""
+
+import asyncio
+
+
+def wrap_future(response_future, loop=None):
+    """asyncio future of the rows of every page of ``response_future``."""
+    loop = loop or asyncio.get_event_loop()
+    future = loop.create_future()
+    rows = []
+
+    def resolve(set_outcome, outcome):
+        if not future.done():
+            set_outcome(outcome)
+
+    def callback(page):
+        rows.extend(page)
+        if response_future.has_more_pages:
+            response_future.start_fetching_next_page()
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, rows)
+
+    def errback(error):
+        loop.call_soon_threadsafe(resolve, future.set_exception, error)
+
+    response_future.add_callbacks(callback, errback)
+
+    return future
+
+
+class AsyncFanout(object):
+
+    def __init__(self, session, max_per_request=8, max_per_process=64):
+        self.session = session
+        self.max_per_request = max(1, max_per_request)
+        self.max_per_process = max(1, max_per_process)
+        self._slots = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def stats(self):
+        return {
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'max_per_request': self.max_per_request,
+            'max_per_process': self.max_per_process,
+        }
+
+    async def execute(self, statement, parameters=None, **execute_kwargs):
+        """Rows of ``statement``, waiting for a process slot first."""
+        if self._slots is None:
+            # Created on first use so that it belongs to the serving loop.
+            self._slots = asyncio.Semaphore(self.max_per_process)
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                rows = await wrap_future(self.session.execute_async(statement, parameters, **execute_kwargs))
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.in_flight -= 1
+            self.completed += 1
+            return rows
+
+    async def execute_many(self, queries, **execute_kwargs):
+        """Result sets of the (statement, parameters) pairs of ``queries``, in their order."""
+        request_slots = asyncio.Semaphore(self.max_per_request)
+
+        async def run(statement, parameters):
+            async with request_slots:
+                return await self.execute(statement, parameters, **execute_kwargs)
+
+        return await asyncio.gather(*[run(statement, parameters) for statement, parameters in queries])
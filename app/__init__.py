@@ -14,18 +14,39 @@ import sys
 from flask import Flask
 from flask_cors import CORS
 
-from cassandra.cluster import Cluster
-from cassandra.query import dict_factory
+from cassandra import ConsistencyLevel
+from cassandra.cluster import Cluster, ExecutionProfile, EXEC_PROFILE_DEFAULT
+from cassandra.query import dict_factory, tuple_factory
 
+from cache import TTLCache
 from cassandra_udts import Averages
 from cassandra_udts import Description
 from cassandra_udts import Name
 from cassandra_udts import Position
 from cassandra_udts import Thumbnails
+from fanout import FanoutExecutor
+from latest import LatestIndex
+from partition_cache import PartitionCache
+from shared_cache import create_shared_cache
+from statements import build_registry
+from streams import StreamHub
 
+try:
+    from gevent import monkey
+    from cassandra.io.geventreactor import GeventConnection
+except ImportError:
+    monkey = None
+
+
+EXEC_PROFILE_TUPLES = 'tuples'
 
 cluster = None
 session = None
+statements = None
+fanout = None
+partition_cache = None
+latest_index = None
+stream_hub = None
 
 app = Flask(__name__)
 app.config.from_object(os.environ['HYDROVIEW_CONFIG'])
@@ -38,16 +59,50 @@ handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(
 log.addHandler(handler)
 log.info("Running HydroView-Flask using {config} settings".format(config=os.environ['HYDROVIEW_CONFIG']))
 
+metadata_cache = TTLCache(app.config['METADATA_CACHE_MAX_ENTRIES'])
+shared_cache = create_shared_cache(app.config['SHARED_CACHE_NAME'], app.config['SHARED_CACHE_MAX_BYTES'])
+
+def connection_class():
+    """The driver's gevent reactor when serving from gevent workers, which patch the socket module, else None.
+    
+    The default reactors do not cooperate with gevent's patched sockets and
+    locks; GeventConnection runs the connections on greenlets instead.
+    """
+    if monkey is not None and monkey.is_module_patched('socket'):
+        return GeventConnection
+    
+    return None
+
+def stream_limit():
+    """Streams a worker process serves at once, None for no limit.
+    
+    A stream holds the worker serving it until its client disconnects, so
+    synchronous workers serve at most STREAM_MAX_SUBSCRIPTIONS, while
+    gevent workers only spend a greenlet per stream. The ASGI entry
+    point sets its own limit, see app/asgi.py.
+    """
+    if connection_class() is not None:
+        return None
+    
+    return app.config['STREAM_MAX_SUBSCRIPTIONS']
+
 def cassandra_connect():
-    global cluster, session
+    global cluster, session, statements, fanout, partition_cache, latest_index, stream_hub
     
     log.info("Initializing Cassandra cluster")
     
-    cluster = Cluster(app.config['HOSTS'], app.config['PORT'])
+    execution_profiles = {
+        EXEC_PROFILE_DEFAULT: ExecutionProfile(consistency_level=ConsistencyLevel.QUORUM, row_factory=dict_factory),
+        EXEC_PROFILE_TUPLES: ExecutionProfile(consistency_level=ConsistencyLevel.QUORUM, row_factory=tuple_factory),
+    }
+    
+    cluster_kwargs = {}
+    if connection_class() is not None:
+        log.info("Using the gevent reactor of the Cassandra driver")
+        cluster_kwargs['connection_class'] = connection_class()
+    
+    cluster = Cluster(app.config['HOSTS'], app.config['PORT'], execution_profiles=execution_profiles, **cluster_kwargs)
     session = cluster.connect(app.config['KEYSPACE'])
-    session.row_factory = dict_factory
-    session.default_consistency_level=4
-    log.debug(session.default_consistency_level)
     
     cluster.register_user_type(app.config['KEYSPACE'], 'averages', Averages)
     cluster.register_user_type(app.config['KEYSPACE'], 'description', Description)
@@ -55,11 +110,27 @@ def cassandra_connect():
     cluster.register_user_type(app.config['KEYSPACE'], 'position', Position)
     cluster.register_user_type(app.config['KEYSPACE'], 'thumbnails', Thumbnails)
     
+    log.info("Preparing CQL statements")
+    statements = build_registry()
+    statements.prepare_all(session)
+    
+    fanout = FanoutExecutor(session, app.config['FANOUT_MAX_IN_FLIGHT_PER_REQUEST'],
+        app.config['FANOUT_MAX_IN_FLIGHT_PER_PROCESS'])
+    partition_cache = PartitionCache(fanout, app.config['PARTITION_CACHE_MAX_ROWS'])
+    
+    latest_index = LatestIndex(session, fanout, statements, app.config['LATEST_QC_LEVEL'],
+        app.config['LATEST_REFRESH_INTERVAL'], app.config['LATEST_STATION_BUCKET'])
+    latest_index.start()
+    stream_hub = StreamHub(session, app.config['STREAM_POLL_INTERVAL'], app.config['STREAM_QUEUE_SIZE'],
+        max_subscriptions=stream_limit(), lag=app.config['INGESTION_LAG'])
+    
     return "Done"
 
 def cassandra_disconnect():
     log.info("Disconnecting from Cassandra cluster")
     
+    if latest_index is not None:
+        latest_index.stop()
     if session is not None:
         session.shutdown()
     if cluster is not None:
@@ -75,6 +146,8 @@ except ImportError:
 else:
     @postfork
     def cassandra_uwsgi_init():
+        if latest_index is not None:
+            latest_index.stop()
         if session is not None:
             session.shutdown()
         if cluster is not None:
@@ -0,0 +1,301 @@
+"""
+    HydroView-Flask ASGI entry point
+
+    Serves the application from an asyncio event loop, e.g. with
+    ``uvicorn app.asgi:application``. The sensor and group measurement
+    endpoints run as coroutines: their partitions are queried through
+    ``aio.AsyncFanout``, which awaits the driver's ResponseFutures instead of
+    blocking a worker on them, so one process serves as many slow range
+    requests at once as Cassandra keeps up with.
+
+    Measurement requests are planned with the helpers of the Flask views, so
+    their arguments, cache validators, partition cache and CORS headers are
+    the same under both entry points. Every other request, and measurement
+    requests for pages, streams or binary encodings, is handed to the Flask
+    application on a thread pool.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import sys
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import request
+from werkzeug.exceptions import HTTPException, InternalServerError
+from werkzeug.http import is_resource_modified
+
+from aio import AsyncFanout
+from app import (EXEC_PROFILE_TUPLES, app, cassandra_disconnect, partition_cache, session, shared_cache,
+    stream_hub, views)
+from serializers import MIMETYPE_JSON
+from statements import PROFILE_PARAMETER_TABLES, SINGLE_PARAMETER_TABLES
+from utils import FastEncoder, to_columnar
+
+log = logging.getLogger(__name__)
+
+# Sensor measurement endpoints by table, e.g. get_hourly_single_parameter_measurements_by_sensor.
+SENSOR_ENDPOINTS = dict(
+    ('get_{}_parameter_measurements_by_sensor'.format(table.name[:-len('_measurements_by_sensor')]), table.name)
+        for table in SINGLE_PARAMETER_TABLES + PROFILE_PARAMETER_TABLES)
+
+GROUP_ENDPOINTS = {
+    'get_daily_group_measurements_by_station': 'daily_parameter_group_measurements_by_station',
+    'get_daily_group_measurements_by_station_time_grouped': 'daily_group_measurements_by_station_grouped',
+    'get_hourly_group_measurements_by_station': 'hourly_parameter_group_measurements_by_station',
+    'get_hourly_group_measurements_by_station_time_grouped': 'hourly_group_measurements_by_station_grouped',
+    'get_thirty_min_group_measurements_by_station_time_grouped': 'thirty_min_group_measurements_by_station_grouped',
+    'get_twenty_min_group_measurements_by_station_time_grouped': 'twenty_min_group_measurements_by_station_grouped',
+    'get_fifteen_min_group_measurements_by_station_time_grouped': 'fifteen_min_group_meas_by_station_grouped',
+    'get_ten_min_group_measurements_by_station_time_grouped': 'ten_min_group_measurements_by_station_grouped',
+    'get_five_min_group_measurements_by_station': 'five_min_group_measurements_by_station',
+    'get_five_min_group_measurements_by_station_time_grouped': 'five_min_group_measurements_by_station_grouped',
+    'get_one_min_group_measurements_by_station_time_grouped': 'one_min_group_measurements_by_station_grouped',
+    'get_one_sec_group_measurements_by_station_time_grouped': 'one_sec_group_measurements_by_station_grouped',
+}
+
+async_fanout = AsyncFanout(session, app.config['FANOUT_MAX_IN_FLIGHT_PER_REQUEST'],
+    app.config['ASGI_MAX_IN_FLIGHT_PER_PROCESS'])
+executor = ThreadPoolExecutor(app.config['ASGI_WSGI_THREADS'])
+# Streams are served from the thread pool; keep some of its threads for the other requests.
+stream_hub.max_subscriptions = min(app.config['ASGI_MAX_STREAMS'], app.config['ASGI_WSGI_THREADS'] - 1)
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/{}'.format(scope.get('http_version', '1.1')),
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        value = value.decode('latin-1')
+        environ[name] = environ[name] + ',' + value if name in environ else value
+
+    return environ
+
+def match(environ):
+    """(endpoint, view arguments) of the request, or (None, None) when Flask is to answer it."""
+    try:
+        return app.url_map.bind_to_environ(environ).match()
+    except HTTPException:
+        return None, None
+
+def measurements_args(endpoint, view_args):
+    """(table, prepared, key, from_timestamp, to_timestamp, descending, columns, constant_columns) of a measurement
+    request served as a coroutine, or None to serve it from Flask."""
+    if endpoint in SENSOR_ENDPOINTS:
+        args = views.sensor_measurements_args(SENSOR_ENDPOINTS[endpoint])
+        constant_columns = views.SENSOR_CONSTANT_COLUMNS
+    elif endpoint in GROUP_ENDPOINTS:
+        from_timestamp = next(value for name, value in view_args.items() if name.startswith('from_'))
+        to_timestamp = next(value for name, value in view_args.items() if name.startswith('to_'))
+        args = views.group_measurements_args(GROUP_ENDPOINTS[endpoint], view_args['station_id'],
+            view_args['group_id'], view_args['qc_level'], from_timestamp, to_timestamp)
+        constant_columns = views.GROUP_CONSTANT_COLUMNS
+    else:
+        return None
+
+    if (request.args.get('page_size', default=0, type=int) > 0 or views.get_flag('stream')
+            or views.get_response_mimetype() != MIMETYPE_JSON):
+        return None
+
+    return args + (constant_columns,)
+
+def finish(environ, response, closed_at=None, etag=None, conditional=False):
+    """``response`` completed as Flask would, with the validators of a measurement range when ``conditional``."""
+    with app.request_context(environ):
+        if conditional:
+            response = views.range_cache_headers(response, closed_at, etag)
+        return app.process_response(response)
+
+async def measurements(environ, endpoint, view_args):
+    """Response of a measurement endpoint, or None when the request is to be served from Flask.
+
+    Mirrors ``views.conditional_response`` around ``views.measurements_response``
+    with the partitions missing from the partition cache awaited together.
+    """
+    with app.request_context(environ):
+        try:
+            args = measurements_args(endpoint, view_args)
+            if args is None:
+                return None
+            table, prepared, key, from_timestamp, to_timestamp, descending, columns, constant_columns = args
+            columnar = views.get_format() == 'columnar'
+        except HTTPException as e:
+            return finish(environ, e.get_response(environ))
+
+        closed_at, etag = views.range_etag(table, to_timestamp)
+        if etag is not None:
+            if not is_resource_modified(environ, etag=etag, last_modified=closed_at):
+                return finish(environ, app.response_class(status=304), closed_at, etag, conditional=True)
+            shared_key = ('measurements', etag, shared_cache.generation('all'))
+            cached = shared_cache.get(*shared_key)
+            if cached is not None:
+                content_type, _, body = cached.partition(b'\n')
+                response = app.response_class(body, content_type=content_type.decode('ascii'))
+                return finish(environ, response, closed_at, etag, conditional=True)
+
+        execute_kwargs = {}
+        if columnar:
+            execute_kwargs['execution_profile'] = EXEC_PROFILE_TUPLES
+            if columns is None:
+                columns = [column[2] for column in prepared.result_metadata]
+        queries, cache_keys = views.partition_queries(prepared, key, table, from_timestamp, to_timestamp, descending,
+            execute_kwargs.get('execution_profile'))
+        cached_rows = partition_cache.lookup(cache_keys)
+
+    fetched = iter(await async_fanout.execute_many(
+        [query for query, rows in zip(queries, cached_rows) if rows is None], **execute_kwargs))
+    results = []
+    for cache_key, rows in zip(cache_keys, cached_rows):
+        if rows is None:
+            rows = next(fetched)
+            partition_cache.store(cache_key, rows)
+        results.append(rows)
+
+    if columnar:
+        data = to_columnar(columns, results, constant_columns, [table.partition_column])
+    else:
+        data = [row for rows in results for row in rows]
+    response = app.response_class(json.dumps(data, cls=FastEncoder))
+    if etag is not None:
+        shared_cache.set(response.headers['Content-Type'].encode('ascii') + b'\n' + response.get_data(),
+            app.config['SHARED_CACHE_MEASUREMENTS_TTL'], *shared_key)
+
+    return finish(environ, response, closed_at, etag, conditional=True)
+
+async def send_response(send, environ, response):
+    app_iter, status, headers = response.get_wsgi_response(environ)
+    await send({
+        'type': 'http.response.start',
+        'status': int(status.split(' ', 1)[0]),
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    })
+    await send({'type': 'http.response.body', 'body': b''.join(app_iter)})
+
+async def serve_wsgi(environ, receive, send):
+    """Serve the request from the Flask application on the thread pool, passing its body on as it is produced.
+
+    A client disconnecting stops the iteration of the body at the next chunk,
+    which ends streams that are waiting for new measurements. Responses to
+    HEAD requests are sent without a body, as on the WSGI path.
+    """
+    loop = asyncio.get_event_loop()
+    head = environ['REQUEST_METHOD'] == 'HEAD'
+    chunks = asyncio.Queue()
+    stopped = threading.Event()
+
+    def put(item):
+        loop.call_soon_threadsafe(chunks.put_nowait, item)
+
+    def start_response(status, headers, exc_info=None):
+        put(('start', status, headers))
+        return lambda data: put(('body', data, None))
+
+    def run():
+        try:
+            result = app(environ, start_response)
+            try:
+                for data in result:
+                    if stopped.is_set():
+                        break
+                    if data:
+                        put(('body', data, None))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        except Exception:
+            log.exception("Serving %s failed", environ['PATH_INFO'])
+            put(('error', None, None))
+        finally:
+            put(('end', None, None))
+
+    async def watch():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        stopped.set()
+
+    watcher = asyncio.ensure_future(watch())
+    done = loop.run_in_executor(executor, run)
+    started = False
+    try:
+        while True:
+            kind, first, second = await chunks.get()
+            if kind == 'start':
+                await send({
+                    'type': 'http.response.start',
+                    'status': int(first.split(' ', 1)[0]),
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in second],
+                })
+                started = True
+                if head:
+                    stopped.set()
+            elif kind == 'body' and not head:
+                await send({'type': 'http.response.body', 'body': first, 'more_body': True})
+            elif kind == 'error' and not started:
+                await send_response(send, environ, InternalServerError().get_response(environ))
+                return
+            elif kind == 'end':
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+    finally:
+        stopped.set()
+        watcher.cancel()
+        await done
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=False)
+            cassandra_disconnect()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        raise ValueError("Unsupported ASGI scope type {}".format(scope['type']))
+
+    body = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        body.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+    environ = wsgi_environ(scope, b''.join(body))
+
+    endpoint, view_args = match(environ)
+    if scope['method'] in ('GET', 'HEAD') and (endpoint in SENSOR_ENDPOINTS or endpoint in GROUP_ENDPOINTS):
+        try:
+            response = await measurements(environ, endpoint, view_args)
+        except Exception:
+            log.exception("Serving %s failed", scope['path'])
+            response = finish(environ, InternalServerError().get_response(environ))
+        if response is not None:
+            return await send_response(send, environ, response)
+
+    await serve_wsgi(environ, receive, send)
@@ -1,90 +1,873 @@
+import functools
+import hashlib
+import hmac
 import json
 import pytz
 import uuid
 
 from collections import defaultdict, OrderedDict
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
 
-from flask import abort, make_response, redirect, request, url_for
+from flask import Response, abort, make_response, redirect, request, stream_with_context, url_for
+from werkzeug.http import is_resource_modified
+
+from app import (EXEC_PROFILE_TUPLES, app, fanout, latest_index, metadata_cache, partition_cache, session,
+    shared_cache, statements, stream_hub)
+from downsampling import downsample_chart
+from frequencies import select_density, select_frequency
+from paging import fetch_page
+from partitions import partition_key, partition_keys, partition_settled_at, partition_span, timestamp_to_datetime
+from resampling import epoch_ms, parse_interval, resample, select_table
+from serializers import MIMETYPE_ARROW, MIMETYPE_JSON, available_mimetypes, encode
+from statements import (DATA_SETS, GROUP_TABLES, GROUPED_TABLES, MEASUREMENT_TABLES, ORDERS, PROFILE_PARAMETER_TABLES,
+    RESOLUTIONS, SINGLE_PARAMETER_TABLES, WEBCAM_PHOTOS_TABLE, normalize_data_sets, sensor_measurements_columns, table_resolution)
+from utils import (FastEncoder, datetime_to_epoch_ms, datetime_to_timestamp_ms, image_mimetype, iter_json_array,
+    make_timestamp_range, request_etag, to_columnar)
+
+def get_order_by(default='DESC'):
+    order_by = request.args.get('order_by', default=default, type=str).upper()
+    if order_by not in ORDERS:
+        abort(400)
+    
+    return order_by
+
+def get_data_sets():
+    data_sets = request.args.getlist('data_sets')
+    
+    try:
+        data_sets = data_sets[0].split(',')
+    except IndexError as e:
+        data_sets = []
+    
+    return normalize_data_sets(data_sets)
+
+def get_flag(name):
+    return request.args.get(name, default='', type=str).lower() in ('1', 'true', 'yes')
+
+def apply_since(from_timestamp, since=None):
+    """Start of the range to read when only rows after ``since`` (epoch ms), or the ``since`` argument, are wanted.
+    
+    Polling clients pass the timestamp of the newest row they have, so only
+    the partitions holding newer rows are queried.
+    """
+    if since is None:
+        since = request.args.get('since', default=None, type=int)
+    if since is None:
+        return from_timestamp
+    
+    return max(from_timestamp, since + 1)
+
+def get_format():
+    response_format = request.args.get('format', default='rows', type=str).lower()
+    if response_format not in ('rows', 'columnar'):
+        abort(400)
+    
+    return response_format
+
+def get_response_mimetype():
+    return request.accept_mimetypes.best_match(available_mimetypes(), default=MIMETYPE_JSON)
+
+def negotiated_response(data, mimetype):
+    if mimetype == MIMETYPE_JSON:
+        response = make_response(json.dumps(data, cls=FastEncoder))
+    else:
+        response = Response(encode(data, mimetype), mimetype=mimetype)
+    response.headers['Vary'] = 'Accept'
+    
+    return response
+
+def metadata_ttl(name):
+    return app.config['METADATA_CACHE_TTLS'].get(name, app.config['METADATA_CACHE_TTL'])
+
+def metadata_generations(station_id=None):
+    """Shared cache generations of everything cached about ``station_id``.
+    
+    Entries not scoped to one station, like the station list, share the
+    'untagged' generation, which is renewed along with that of any station.
+    """
+    return (shared_cache.generation('all'), shared_cache.generation(station_id or 'untagged'))
+
+def metadata_rows(name, parameters, station_id=None):
+    """Rows of the metadata statement ``name``, cached per worker.
+    
+    Entries are tagged with ``station_id`` so that the admin endpoint can drop
+    everything cached about a station. The returned list is shared between
+    requests and must not be modified.
+    """
+    key = (name, parameters) + metadata_generations(station_id)
+    rows = metadata_cache.get(key)
+    if rows is None:
+        rows = list(session.execute_async(statements.get(name), parameters).result())
+        metadata_cache.set(key, rows, metadata_ttl(name), tag=station_id)
+    
+    return rows
+
+def shared_response(ttl, view, *key):
+    """Response of ``view``, its body shared by the workers of the host for ``ttl`` seconds."""
+    cached = shared_cache.get(*key)
+    if cached is not None:
+        content_type, _, body = cached.partition(b'\n')
+        return Response(body, content_type=content_type.decode('ascii'))
+    
+    response = app.make_response(view())
+    if response.status_code == 200 and not response.is_streamed:
+        shared_cache.set(response.headers['Content-Type'].encode('ascii') + b'\n' + response.get_data(), ttl, *key)
+    
+    return response
+
+def shared_metadata(name):
+    """Decorate a metadata endpoint reading statement ``name`` to share its responses between workers."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            station_id = kwargs.get('station_id') or request.args.get('station_id', type=uuid.UUID)
+            return shared_response(metadata_ttl(name), lambda: view(*args, **kwargs),
+                'metadata', request.full_path, *metadata_generations(station_id))
+        return wrapper
+    return decorator
+
+def require_admin():
+    token = app.config['ADMIN_TOKEN']
+    if not token or not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token):
+        abort(403)
+
+def settle_ms(table):
+    """Milliseconds after the end of a partition of ``table`` until its rows are complete.
+    
+    The row of a bucket is written once the bucket has ended, one resolution
+    after its timestamp, and may take INGESTION_LAG longer to arrive.
+    """
+    return (table_resolution(table) + app.config['INGESTION_LAG']) * 1000
+
+def range_etag(table, to_timestamp):
+    """(time the last partition of a range ending at ``to_timestamp`` settles, ETag of the request once it has)."""
+    settled_at = partition_settled_at(table.partition_column, to_timestamp, settle_ms(table))
+    if settled_at > datetime.utcnow():
+        return settled_at, None
+    
+    return settled_at, request_etag(app.config['ETAG_VERSION'], request.full_path, get_response_mimetype())
+
+def range_cache_headers(response, closed_at, etag):
+    """Validators and lifetime of a measurement ``response``, see conditional_response."""
+    if etag is not None:
+        response.set_etag(etag)
+        response.last_modified = closed_at
+        response.cache_control.max_age = app.config['CLOSED_RANGE_MAX_AGE']
+    else:
+        if not response.is_streamed:
+            response.add_etag()
+        response.cache_control.max_age = app.config['OPEN_RANGE_MAX_AGE']
+    response.cache_control.public = True
+    response.headers['Vary'] = 'Accept'
+    
+    return response.make_conditional(request)
+
+def conditional_response(table, to_timestamp, view):
+    """Response of ``view`` with validators and a lifetime for a range ending at ``to_timestamp``.
+    
+    Once the last partition of the range has settled, see settle_ms, the
+    response can only change with the request itself, so it is validated by
+    an ETag of the request and a matching If-None-Match or If-Modified-Since
+    is answered with 304 before Cassandra is queried. Ranges reaching into a
+    partition that has not settled are cached briefly and validated by a
+    hash of the body.
+    """
+    closed_at, etag = range_etag(table, to_timestamp)
+    
+    if etag is None:
+        response = app.make_response(view())
+    elif not is_resource_modified(request.environ, etag=etag, last_modified=closed_at):
+        response = Response(status=304)
+    else:
+        response = shared_response(app.config['SHARED_CACHE_MEASUREMENTS_TTL'], view,
+            'measurements', etag, shared_cache.generation('all'))
+    
+    return range_cache_headers(response, closed_at, etag)
+
+def partition_queries(prepared, key, table, from_timestamp, to_timestamp, descending=False, execution_profile=None):
+    """(statement, parameters) of ``prepared`` for every partition of ``table`` in the range, and their cache keys.
+    
+    Partitions that have settled, see settle_ms, and lie within the range get
+    a partition cache key, the others None.
+    """
+    partitions = partition_keys(table.partition_column, from_timestamp, to_timestamp, descending)
+    now = datetime_to_epoch_ms(datetime.utcnow())
+    settle = settle_ms(table)
+    generation = shared_cache.generation('all')
+    
+    queries = []
+    cache_keys = []
+    for partition in partitions:
+        queries.append((prepared, key + (partition, from_timestamp, to_timestamp, )))
+        start, end = partition_span(table.partition_column, partition)
+        if end + settle <= now and from_timestamp <= start and end - 1 <= to_timestamp:
+            cache_keys.append((prepared.query_string, execution_profile, key, partition, generation))
+        else:
+            cache_keys.append(None)
+    
+    return queries, cache_keys
+
+def query_partitions(prepared, key, table, from_timestamp, to_timestamp, descending=False, **execute_kwargs):
+    """Result sets of ``prepared`` for every partition of ``table`` in the range, read through the partition cache."""
+    queries, cache_keys = partition_queries(prepared, key, table, from_timestamp, to_timestamp, descending,
+        execute_kwargs.get('execution_profile'))
+    
+    return partition_cache.execute_many(queries, cache_keys, **execute_kwargs)
+
+def measurements_response(prepared, key, table, from_timestamp, to_timestamp, descending=False, columns=None,
+        constant_columns=()):
+    """Rows of ``prepared`` over the partitions of ``table`` in the requested range.
+    
+    With ``format=columnar``, and always for the binary encodings negotiated
+    through the Accept header, one array per column is returned instead of one
+    object per row, with ``constant_columns`` given once. ``columns`` names the
+    selected columns and defaults to the result metadata of ``prepared``.
+    """
+    mimetype = get_response_mimetype()
+    columnar = get_format() == 'columnar' or mimetype != MIMETYPE_JSON
+    execute_kwargs = {}
+    if columnar:
+        execute_kwargs['execution_profile'] = EXEC_PROFILE_TUPLES
+        if columns is None:
+            columns = [column[2] for column in prepared.result_metadata]
+        omitted_columns = [table.partition_column]
+    
+    page_size = request.args.get('page_size', default=0, type=int)
+    if page_size > 0:
+        partitions = partition_keys(table.partition_column, from_timestamp, to_timestamp, descending)
+        page_size = min(page_size, app.config['MAX_PAGE_SIZE'])
+        cursor = request.args.get('cursor', default=None, type=str)
+        try:
+            rows, next_cursor = fetch_page(session, prepared, key, partitions, (from_timestamp, to_timestamp, ),
+                page_size, cursor, **execute_kwargs)
+        except ValueError:
+            abort(400)
+        
+        if mimetype != MIMETYPE_JSON:
+            # Binary pages carry the cursor as one more scalar next to the columns.
+            data = to_columnar(columns, [rows], constant_columns, omitted_columns)
+            data['next_cursor'] = next_cursor
+            return negotiated_response(data, mimetype)
+        
+        if columnar:
+            rows = to_columnar(columns, [rows], constant_columns, omitted_columns)
+        
+        return json.dumps({'data': rows, 'next_cursor': next_cursor}, cls=FastEncoder)
+    
+    results = query_partitions(prepared, key, table, from_timestamp, to_timestamp, descending, **execute_kwargs)
+    
+    if columnar:
+        return negotiated_response(to_columnar(columns, results, constant_columns, omitted_columns), mimetype)
+    
+    if get_flag('stream'):
+        response = Response(stream_with_context(iter_json_array(results, cls=FastEncoder)), mimetype='application/json')
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
+    data = []
+    for rows in results:
+        for row in rows:
+            data.append(row)
+    
+    return json.dumps(data, cls=FastEncoder)
+
+SENSOR_CONSTANT_COLUMNS = ('sensor_id', 'parameter_id', 'qc_level', 'unit')
+GROUP_CONSTANT_COLUMNS = ('station_id', 'group_id', 'qc_level')
+
+def sensor_measurements_args(table_name):
+    """(table, prepared, key, from_timestamp, to_timestamp, descending, columns) of a sensor measurements request."""
+    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
+    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
+    qc_level = request.args.get('qc_level', type=int)
+    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
+    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
+    order_by = get_order_by()
+    data_sets = get_data_sets()
+    
+    table = MEASUREMENT_TABLES[table_name]
+    prepared = statements.get(table.name, data_sets=data_sets, order=order_by)
+    
+    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
+    from_timestamp = apply_since(from_timestamp)
+    
+    return (table, prepared, (sensor_id, parameter_id, qc_level), from_timestamp, to_timestamp, order_by == 'DESC',
+        sensor_measurements_columns(table, data_sets))
+
+def sensor_measurements(table_name):
+    table, prepared, key, from_timestamp, to_timestamp, descending, columns = sensor_measurements_args(table_name)
+    
+    return conditional_response(table, to_timestamp, lambda: measurements_response(
+        prepared, key, table, from_timestamp, to_timestamp, descending=descending, columns=columns,
+        constant_columns=SENSOR_CONSTANT_COLUMNS))
+
+def dynamic_sensor_measurements(tables, parameter_type):
+    """Sensor measurements from the stored frequency suiting the range, see frequencies.py.
+    
+    With ``points`` the coarsest frequency returning at least that many rows
+    is used, otherwise the finest one within the configured budget.
+    """
+    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
+    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
+    parameter_type = request.args.get('parameter_type', default=parameter_type, type=str)
+    points = request.args.get('points', default=None, type=int)
+    from_timestamp, to_timestamp = make_timestamp_range(
+        request.args.get('from_timestamp', default=None, type=int),
+        request.args.get('to_timestamp', default=None, type=int))
+    if sensor_id is None or parameter_id is None or (points is not None and points < 1):
+        abort(400)
+    
+    rows = metadata_rows('measurement_frequencies_by_sensor_parameter', (sensor_id, parameter_id, parameter_type,))
+    frequencies = (rows[0].get('measurement_frequencies') or []) if rows else []
+    
+    context = 'sensor {} parameter {}'.format(sensor_id, parameter_id)
+    if points is None:
+        selected = select_frequency(frequencies, tables, from_timestamp, to_timestamp,
+            app.config['DYNAMIC_MAX_POINTS'], app.config['DYNAMIC_MAX_PARTITIONS'], context=context)
+    else:
+        selected = select_density(frequencies, tables, from_timestamp, to_timestamp, points, context=context)
+    if selected is None:
+        return json.dumps([], cls=FastEncoder)
+    
+    response = sensor_measurements(selected.table.name)
+    response.headers['X-Measurement-Frequency'] = selected.frequency
+    
+    return response
+
+def group_measurements_args(table_name, station_id, group_id, qc_level, from_timestamp, to_timestamp):
+    """(table, prepared, key, from_timestamp, to_timestamp, descending, columns) of a group measurements request."""
+    table = MEASUREMENT_TABLES[table_name]
+    
+    return (table, statements.get(table.name, order=None), (station_id, group_id, qc_level),
+        apply_since(from_timestamp), to_timestamp, False, None)
+
+def group_measurements(table_name, station_id, group_id, qc_level, from_timestamp, to_timestamp):
+    table, prepared, key, from_timestamp, to_timestamp, descending, columns = group_measurements_args(
+        table_name, station_id, group_id, qc_level, from_timestamp, to_timestamp)
+    
+    return conditional_response(table, to_timestamp, lambda: measurements_response(
+        prepared, key, table, from_timestamp, to_timestamp, constant_columns=GROUP_CONSTANT_COLUMNS))
+
+CHART_COLUMNS = ('timestamp', 'avg_value', 'min_value', 'max_value')
 
-from app import app, session
-from utils import CustomEncoder, datetime_to_timestamp_ms, make_timestamp_range
+def chart_series(columns, result_sets, time_column, qc_level):
+    """Per parameter chart columns of tuple rows with the given ``columns``."""
+    parameter_index = columns.index('parameter_id')
+    unit_index = columns.index('unit')
+    value_indexes = [columns.index(name) for name in (time_column, ) + CHART_COLUMNS[1:]]
+    
+    parameters = OrderedDict()
+    
+    for rows in result_sets:
+        for row in rows:
+            parameter_id_str = str(row[parameter_index])
+            if parameter_id_str not in parameters:
+                parameters[parameter_id_str] = OrderedDict([
+                    ('id', row[parameter_index]),
+                    ('qc_level', qc_level),
+                    ('unit', row[unit_index]),
+                ] + [(name, []) for name in CHART_COLUMNS])
+            series = parameters[parameter_id_str]
+            for name, index in zip(CHART_COLUMNS, value_indexes):
+                series[name].append(row[index])
+    
+    return parameters
+
+def get_max_points():
+    max_points = request.args.get('max_points', default=None, type=int)
+    if max_points is not None and max_points < 3:
+        abort(400)
+    
+    return max_points
+
+def downsample_series(parameters, max_points):
+    for series in parameters.values():
+        downsampled = downsample_chart(*[series[name] for name in CHART_COLUMNS], max_points=max_points)
+        for name, values in zip(CHART_COLUMNS, downsampled):
+            series[name] = values
+    
+    return parameters
+
+def flatten_series(parameters, columns):
+    """One flat set of ``columns`` over every series, a parameter_id column telling the series apart."""
+    data = OrderedDict([('parameter_id', [])] + [(name, []) for name in columns])
+    units = OrderedDict()
+    for parameter_id_str, series in parameters.items():
+        data['parameter_id'].extend([parameter_id_str] * len(series['timestamp']))
+        for name in columns:
+            data[name].extend(series[name])
+        units[parameter_id_str] = series['unit']
+    data['units'] = units
+    
+    return data
+
+def chart_response(parameters, mimetype):
+    if mimetype == MIMETYPE_JSON:
+        data = OrderedDict()
+        for parameter_id_str, series in parameters.items():
+            data[parameter_id_str] = {
+                'id': series['id'],
+                'qc_level': series['qc_level'],
+                'unit': series['unit'],
+                'averages': [list(point) for point in zip(series['timestamp'], series['avg_value'])],
+                'ranges': [list(point) for point in zip(series['timestamp'], series['min_value'], series['max_value'])]
+            }
+        return negotiated_response(data, mimetype)
+    
+    if mimetype == MIMETYPE_ARROW:
+        return negotiated_response(flatten_series(parameters, CHART_COLUMNS), mimetype)
+    
+    return negotiated_response(parameters, mimetype)
+
+def group_chart(table_name, station_id, group_id, qc_level, from_timestamp, to_timestamp):
+    table = MEASUREMENT_TABLES[table_name]
+    from_timestamp = apply_since(from_timestamp)
+    prepared = statements.get(table.name, order='ASC')
+    columns = [column[2] for column in prepared.result_metadata]
+    max_points = get_max_points()
+    
+    def view():
+        results = query_partitions(prepared, (station_id, group_id, qc_level), table, from_timestamp, to_timestamp,
+            execution_profile=EXEC_PROFILE_TUPLES)
+        parameters = chart_series(columns, results, table.time_column, qc_level)
+        if max_points:
+            parameters = downsample_series(parameters, max_points)
+        return chart_response(parameters, get_response_mimetype())
+    
+    return conditional_response(table, to_timestamp, view)
+
+def batch_series(spec):
+    """(table, prepared, key, from_timestamp, to_timestamp, descending, columns) of one batch series spec."""
+    table = MEASUREMENT_TABLES['{}_{}_measurements_by_sensor'.format(
+        spec['resolution'], spec.get('parameter_type', 'single'))]
+    order_by = str(spec.get('order_by', 'DESC')).upper()
+    if order_by not in ORDERS:
+        raise ValueError(order_by)
+    data_sets = normalize_data_sets(spec.get('data_sets') or [])
+    key = (uuid.UUID(spec['sensor_id']), uuid.UUID(spec['parameter_id']), int(spec['qc_level']))
+    from_timestamp, to_timestamp = make_timestamp_range(spec.get('from_timestamp'), spec.get('to_timestamp'))
+    if spec.get('since') is not None:
+        from_timestamp = apply_since(int(from_timestamp), int(spec['since']))
+    
+    return (table, statements.get(table.name, data_sets=data_sets, order=order_by), key, int(from_timestamp),
+        int(to_timestamp), order_by == 'DESC', sensor_measurements_columns(table, data_sets))
+
+def iter_batch(series, results, columnar):
+    """Encode the result sets of every series as one JSON object, one chunk per series.
+    
+    ``series`` holds (name, number of result sets, columns, partition column)
+    per series, in the order their result sets are generated by ``results``.
+    """
+    encoder = FastEncoder()
+    separator = ''
+    
+    yield '{'
+    for name, count, columns, partition_column in series:
+        result_sets = [next(results) for _ in range(count)]
+        if columnar:
+            data = to_columnar(columns, result_sets, SENSOR_CONSTANT_COLUMNS, [partition_column])
+        else:
+            data = [row for rows in result_sets for row in rows]
+        yield separator + encoder.encode(name) + ':' + encoder.encode(data)
+        separator = ','
+    yield '}'
+
+RESAMPLE_COLUMNS = ('timestamp', 'min_value', 'avg_value', 'max_value', 'rows')
+
+def resample_series(parameters, interval):
+    interval_ms = interval * 1000
+    for series in parameters.values():
+        timestamps = [epoch_ms(timestamp) for timestamp in series['timestamp']]
+        resampled = resample(timestamps, series['min_value'], series['avg_value'], series['max_value'], interval_ms)
+        for name, values in zip(RESAMPLE_COLUMNS, resampled):
+            series[name] = values
+    
+    return parameters
 
 @app.route('/')
 def index():
     return make_response(open('app/templates/index.html').read())
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    data = {
+        'fanout': fanout.stats(),
+        'metadata_cache': metadata_cache.stats(),
+        'shared_cache': shared_cache.stats(),
+        'partition_cache': partition_cache.stats(),
+        'latest_index': latest_index.stats(),
+        'streams': stream_hub.stats(),
+    }
+    
+    return json.dumps(data, cls=FastEncoder)
+
+@app.route('/api/batch/measurements', methods=['POST'])
+def get_batch_measurements():
+    """Measurements of several sensor parameters in one request.
+    
+    The body is a JSON object whose ``series`` list holds one object per
+    series with the arguments of the sensor measurement endpoints (sensor_id,
+    parameter_id, qc_level, from_timestamp, to_timestamp, since, order_by and
+    data_sets), a ``resolution`` such as ``ten_min`` or ``hourly``, and
+    optionally a ``parameter_type`` of ``single`` or ``profile`` and the
+    ``key`` of the series in the response, its index by default.
+    
+    The partition queries of all series run through one bounded fan-out and
+    the response is streamed as an object of series keyed by their keys.
+    """
+    body = request.get_json(silent=True)
+    specs = body.get('series') if isinstance(body, dict) else None
+    if not isinstance(specs, list) or not specs or len(specs) > app.config['BATCH_MAX_SERIES']:
+        abort(400)
+    
+    columnar = get_format() == 'columnar'
+    execution_profile = EXEC_PROFILE_TUPLES if columnar else None
+    
+    series = []
+    queries = []
+    cache_keys = []
+    for index, spec in enumerate(specs):
+        try:
+            table, prepared, key, from_timestamp, to_timestamp, descending, columns = batch_series(spec)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            abort(400)
+        series_queries, series_cache_keys = partition_queries(prepared, key, table, from_timestamp, to_timestamp,
+            descending, execution_profile)
+        series.append((str(spec.get('key', index)), len(series_queries), columns, table.partition_column))
+        queries.extend(series_queries)
+        cache_keys.extend(series_cache_keys)
+    
+    if len(set(name for name, count, columns, partition_column in series)) < len(series):
+        abort(400)
+    
+    execute_kwargs = {'execution_profile': execution_profile} if columnar else {}
+    results = partition_cache.execute_many(queries, cache_keys, **execute_kwargs)
+    
+    response = Response(stream_with_context(iter_batch(series, results, columnar)), mimetype='application/json')
+    response.headers['X-Accel-Buffering'] = 'no'
+    
+    return response
+
+@app.route('/api/latest/<uuid:station_id>', methods=['GET'])
+def get_latest_measurements(station_id):
+    """Newest value of every single parameter series of a station, from the in-memory index of latest.py."""
+    refreshed_at, values = latest_index.get(station_id)
+    data = OrderedDict([
+        ('station_id', station_id),
+        ('refreshed_at', refreshed_at),
+        ('series', values),
+    ])
+    
+    response = app.make_response(json.dumps(data, cls=FastEncoder))
+    response.add_etag()
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['LATEST_REFRESH_INTERVAL']
+    
+    return response.make_conditional(request)
+
+def iter_events(subscription):
+    """Server-Sent Events of ``subscription``, sent while the client is connected."""
+    yield 'retry: {}\n\n'.format(app.config['STREAM_POLL_INTERVAL'] * 1000)
+    while True:
+        message = subscription.get(app.config['STREAM_KEEPALIVE'])
+        if subscription.closed:
+            break
+        if message is None:
+            yield ': keepalive\n\n'
+            continue
+        last_timestamp, data = message
+        yield 'id: {}\nevent: measurements\ndata: {}\n\n'.format(last_timestamp, data)
+
+@app.route('/api/stream/<uuid:station_id>/<uuid:group_id>', methods=['GET'])
+def stream_group_measurements(station_id, group_id):
+    """New measurements of a station group as Server-Sent Events.
+    
+    ``resolution`` (``five_min`` by default) and ``qc_level`` (0 by default)
+    select the group table followed. Each event is a JSON array of the rows
+    stored since the previous one, with the timestamp of the newest as event
+    id. Every stream holds its worker open, so a process only serves as many
+    streams at once as its hub allows and answers 503 beyond that.
+    """
+    resolution = request.args.get('resolution', default='five_min', type=str)
+    qc_level = request.args.get('qc_level', default=0, type=int)
+    tables = [table for table in GROUP_TABLES if table_resolution(table) == RESOLUTIONS.get(resolution)]
+    if not tables:
+        abort(400)
+    table = tables[0]
+    
+    subscription = stream_hub.subscribe((station_id, group_id, qc_level), table, statements.get(table.name, order='ASC'))
+    if subscription is None:
+        response = make_response('', 503)
+        response.headers['Retry-After'] = str(app.config['STREAM_POLL_INTERVAL'])
+        return response
+    
+    response = Response(stream_with_context(iter_events(subscription)), mimetype='text/event-stream')
+    # Closed by the server when the client disconnects, even before the first event.
+    response.call_on_close(lambda: stream_hub.unsubscribe(subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    
+    return response
+
+@app.route('/api/resample', methods=['GET'])
+def get_resampled_measurements():
+    """Min, average and max of a sensor parameter or a station group per ``interval``.
+    
+    The series is read from the coarsest resolution stored for it that
+    divides the interval, see resampling.py.
+    """
+    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
+    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
+    station_id = request.args.get('station_id', type=uuid.UUID)
+    group_id = request.args.get('group_id', type=uuid.UUID)
+    qc_level = request.args.get('qc_level', type=int)
+    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
+    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
+    try:
+        interval = parse_interval(request.args.get('interval', type=str))
+    except ValueError:
+        abort(400)
+    
+    if sensor_id is not None and parameter_id is not None and qc_level is not None:
+        rows = metadata_rows('measurement_frequencies_by_sensor_parameter', (sensor_id, parameter_id, 'single',))
+        frequencies = (rows[0].get('measurement_frequencies') or []) if rows else []
+        table = select_table(SINGLE_PARAMETER_TABLES, interval, frequencies)
+        if table is None:
+            abort(400)
+        prepared = statements.get(table.name, data_sets=DATA_SETS, order='ASC')
+        columns = sensor_measurements_columns(table, DATA_SETS)
+        key = (sensor_id, parameter_id, qc_level)
+    elif station_id is not None and group_id is not None and qc_level is not None:
+        rows = metadata_rows('group_measurement_frequencies_by_station_group', (station_id, group_id,), station_id)
+        frequencies = (rows[0].get('measurement_frequencies') or []) if rows else []
+        table = select_table(GROUP_TABLES, interval, frequencies)
+        if table is None:
+            abort(400)
+        prepared = statements.get(table.name, order='ASC')
+        columns = [column[2] for column in prepared.result_metadata]
+        key = (station_id, group_id, qc_level)
+    else:
+        abort(400)
+    
+    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
+    if (to_timestamp - from_timestamp) // (table_resolution(table) * 1000) > app.config['RESAMPLE_MAX_SOURCE_ROWS']:
+        abort(400)
+    
+    def view():
+        results = query_partitions(prepared, key, table, from_timestamp, to_timestamp,
+            execution_profile=EXEC_PROFILE_TUPLES)
+        parameters = resample_series(chart_series(columns, results, table.time_column, qc_level), interval)
+        mimetype = get_response_mimetype()
+        if mimetype == MIMETYPE_ARROW:
+            data = flatten_series(parameters, RESAMPLE_COLUMNS)
+        else:
+            data = OrderedDict([('parameters', parameters)])
+        data['interval'] = interval
+        data['source'] = table.name
+        return negotiated_response(data, mimetype)
+    
+    return conditional_response(table, to_timestamp, view)
+
+@app.route('/api/admin/metadata_cache/invalidate', methods=['POST'])
+def invalidate_metadata_cache():
+    require_admin()
+    station_id = request.args.get('station_id', type=uuid.UUID)
+    
+    if station_id is None:
+        shared_cache.bump('all')
+        partition_cache.clear()
+        invalidated = metadata_cache.clear()
+    else:
+        # Untagged entries, like the station list, may describe the station too.
+        shared_cache.bump(station_id)
+        shared_cache.bump('untagged')
+        invalidated = metadata_cache.invalidate((station_id, None))
+    
+    return json.dumps({'invalidated': invalidated}, cls=FastEncoder)
+
 ########## Stations API ############
 
+THUMBNAIL_SIZES = ('xl', 'l', 'm', 's')
+
+def get_thumbnail_sizes():
+    """Thumbnail sizes selected by the ``thumbnails`` argument, all of them when absent and none for ``none``."""
+    thumbnails = request.args.get('thumbnails', default=None, type=str)
+    if thumbnails is None:
+        return THUMBNAIL_SIZES
+    if thumbnails.lower() == 'none':
+        return ()
+    sizes = tuple(size for size in thumbnails.lower().split(',') if size)
+    if any(size not in THUMBNAIL_SIZES for size in sizes):
+        abort(400)
+    
+    return sizes
+
+def thumbnail_version(data):
+    return hashlib.sha1(data).hexdigest()[:12]
+
+def station_thumbnails(row, sizes, urls):
+    """Copy of a station ``row`` with only the thumbnail ``sizes`` and, if ``urls`` is set, thumbnail URLs."""
+    thumbnails = row.get('thumbnails')
+    station = OrderedDict((name, value) for name, value in row.items() if name != 'thumbnails')
+    if sizes:
+        station['thumbnails'] = None if thumbnails is None else OrderedDict(
+            (size, getattr(thumbnails, size)) for size in sizes)
+    if urls:
+        station['thumbnail_urls'] = OrderedDict()
+        for size in THUMBNAIL_SIZES:
+            data = getattr(thumbnails, size, None)
+            if data:
+                station['thumbnail_urls'][size] = url_for('get_station_thumbnail', station_id=row['id'], size=size,
+                    v=thumbnail_version(data))
+    
+    return station
+
 @app.route('/api/stations', methods=['GET'])
+@shared_metadata('stations')
 def get_stations():
+    """Stations of a bucket.
+    
+    ``thumbnails`` selects the embedded thumbnail sizes, e.g. ``thumbnails=s``
+    or ``thumbnails=none``, all by default. With ``thumbnail_urls=1`` every
+    station also lists the versioned URLs of its thumbnail images.
+    """
     bucket = request.args.get('bucket', default=0, type=int)
-    query = "SELECT * FROM stations WHERE bucket=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (bucket,)).result()
-    data = [row for row in rows]
+    sizes = get_thumbnail_sizes()
+    urls = get_flag('thumbnail_urls')
+    rows = metadata_rows('stations', (bucket,))
+    if sizes == THUMBNAIL_SIZES and not urls:
+        data = [row for row in rows]
+    else:
+        data = [station_thumbnails(row, sizes, urls) for row in rows]
+
+    return json.dumps(data, cls=FastEncoder)
 
-    return json.dumps(data, cls=CustomEncoder)
+@app.route('/api/station_thumbnail/<uuid:station_id>/<size>', methods=['GET'])
+def get_station_thumbnail(station_id, size):
+    """One thumbnail image of a station.
+    
+    The URLs listed by /api/stations carry the version of the image, so they
+    are cached as immutable; the ETag is the hash of the image.
+    """
+    if size not in THUMBNAIL_SIZES:
+        abort(404)
+    rows = metadata_rows('station_info_by_station', (station_id,), station_id=station_id)
+    thumbnails = rows[0].get('thumbnails') if rows else None
+    data = getattr(thumbnails, size, None)
+    if not data:
+        abort(404)
+    
+    response = Response(data, mimetype=image_mimetype(data))
+    response.set_etag(thumbnail_version(data))
+    if request.args.get('v') == thumbnail_version(data):
+        response.headers['Cache-Control'] = 'public, max-age={}, immutable'.format(app.config['CLOSED_RANGE_MAX_AGE'])
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = metadata_ttl('station_info_by_station')
+    
+    return response.make_conditional(request)
     
 @app.route('/api/station', methods=['GET'])
+@shared_metadata('station_info_by_station')
 def get_station():
     station_id = request.args.get('station_id', type=uuid.UUID)
-    query = "SELECT * FROM station_info_by_station WHERE id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('station_info_by_station', (station_id,), station_id=station_id)
     try:
         data = rows[0]
     except IndexError:    
         abort(404)
     
-    return json.dumps(data, cls=CustomEncoder)    
+    return json.dumps(data, cls=FastEncoder)    
+
+STATION_BUNDLE = OrderedDict([
+    ('sensors', 'sensors_by_station'),
+    ('parameters', 'parameters_by_station'),
+    ('groups', 'parameter_groups_by_station'),
+    ('group_parameters', 'group_parameters_by_station'),
+    ('parameter_measurement_frequencies', 'parameter_measurement_frequencies_by_station'),
+    ('group_qc_levels', 'group_qc_levels_by_station'),
+    ('parameter_qc_levels', 'parameter_qc_levels_by_station'),
+])
+
+@app.route('/api/station_bundle/<uuid:station_id>', methods=['GET'])
+@shared_metadata('station_bundle')
+def get_station_bundle(station_id):
+    """Station info and the station metadata a station page needs, queried concurrently."""
+    names = ['station_info_by_station'] + list(STATION_BUNDLE.values())
+    results = fanout.execute_many([(statements.get(name), (station_id,)) for name in names])
+    
+    try:
+        station = list(next(results))[0]
+    except IndexError:
+        abort(404)
+    
+    data = OrderedDict([('station', station)])
+    for key in STATION_BUNDLE:
+        data[key] = list(next(results))
+    
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/profile_vertical_positions_by_station_parameter', methods=['GET'])
+@shared_metadata('vertical_positions_by_station_parameter')
 def get_profile_vertical_positions_by_station_parameter():
     station_id = request.args.get('station_id', type=uuid.UUID)
     parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    query = "SELECT * FROM vertical_positions_by_station_parameter WHERE station_id=? AND parameter_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id, parameter_id,)).result()
+    rows = metadata_rows('vertical_positions_by_station_parameter', (station_id, parameter_id,), station_id=station_id)
     data =  [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/webcam_live_urls_by_station', methods=['GET'])
+@shared_metadata('webcam_live_urls_by_station')
 def get_webcam_live_urls_by_station():
     station_id = request.args.get('station_id', type=uuid.UUID)
-    query = "SELECT * FROM webcam_live_urls_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('webcam_live_urls_by_station', (station_id,), station_id=station_id)
     data =  [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/video_urls_by_station', methods=['GET'])
 def get_video_urls_by_station():
     station_id = request.args.get('station_id', type=uuid.UUID)
     from_timestamp = request.args.get('from_timestamp', type=int)
     to_timestamp = request.args.get('to_timestamp', type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
+    order_by = get_order_by()
     limit = request.args.get('limit', default=0, type=int)
     
-    query = """
-        SELECT * FROM video_urls_by_station WHERE station_id=? AND added_date>=? AND 
-            added_date<=? ORDER BY added_date {order}""".format(order=order_by)
+    prepared = statements.get('video_urls_by_station', order=order_by, limit=bool(limit))
+    from_dt = timestamp_to_datetime(from_timestamp)
+    to_dt = timestamp_to_datetime(to_timestamp)
     
+    parameters = (station_id, from_dt, to_dt,)
     if limit:
-        query += " LIMIT {limit}".format(limit=limit)
-
-    prepared = session.prepare(query)
-    from_dt = datetime.fromtimestamp(from_timestamp/1000)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000)
+        parameters += (limit,)
     
-    rows = session.execute_async(prepared, (station_id, from_dt, to_dt,)).result()   
+    rows = session.execute_async(prepared, parameters).result()   
     
     data = [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
+
+def webcam_photo_results(station_id, from_timestamp, on_timestamp, to_timestamp, order_by, limit, sequential=False):
+    """Result sets of the hourly webcam photos on ``on_timestamp``'s date or in the range.
+    
+    The dates of a range are read through the fan-out, or one after another
+    when ``sequential`` is set.
+    """
+    ranged = bool(from_timestamp and to_timestamp)
+    prepared = statements.get('hourly_webcam_photos_by_station', order=order_by, ranged=ranged, limit=bool(limit))
+    limit_parameters = (limit,) if limit else ()
+    
+    if on_timestamp:
+        on_date = partition_key('date', on_timestamp)
+        return [session.execute_async(prepared, (station_id, on_date,) + limit_parameters).result()]
+    elif ranged:
+        dates = partition_keys('date', from_timestamp, to_timestamp, descending=order_by == 'DESC')
+        parameters_list = [(station_id, current_date, from_timestamp, to_timestamp,) + limit_parameters for current_date in dates]
+        if sequential:
+            return (session.execute_async(prepared, parameters).result() for parameters in parameters_list)
+        return fanout.execute(prepared, parameters_list)
+    
+    return []
 
 @app.route('/api/hourly_webcam_photos_by_station', methods=['GET'])
 def get_hourly_webcam_photos_by_station():
@@ -92,1919 +875,390 @@ def get_hourly_webcam_photos_by_station():
     from_timestamp = request.args.get('from_timestamp', type=int)
     on_timestamp = request.args.get('on_timestamp', type=int)
     to_timestamp = request.args.get('to_timestamp', type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
+    order_by = get_order_by()
     limit = request.args.get('limit', default=0, type=int)
     
-    query = "SELECT * FROM hourly_webcam_photos_by_station WHERE station_id=? AND date=? "
-        
-    if from_timestamp and to_timestamp: 
-        query += "AND timestamp >=? AND timestamp <=? "
+    data = []
+    for rows in webcam_photo_results(station_id, from_timestamp, on_timestamp, to_timestamp, order_by, limit):
+        for row in rows:
+            data.append(row)
     
-    query += "ORDER BY timestamp {order} ".format(order=order_by)
+    return json.dumps(data, cls=FastEncoder)
 
-    if limit:
-        query += "LIMIT {limit}".format(limit=limit)
+@app.route('/api/hourly_webcam_photo_list_by_station', methods=['GET'])
+def get_hourly_webcam_photo_list_by_station():
+    """The photos of /api/hourly_webcam_photos_by_station without their bytes.
     
-    prepared = session.prepare(query)
-    
-    data = []
+    Each photo is listed with its timestamp, its size in bytes and the URL of
+    its image. Cassandra has no length function for blobs, so the photos are
+    still read, one date at a time so that at most a day of photos is held in
+    memory, and listings of past dates are cached.
+    """
+    station_id = request.args.get('station_id', type=uuid.UUID)
+    from_timestamp = request.args.get('from_timestamp', type=int)
+    on_timestamp = request.args.get('on_timestamp', type=int)
+    to_timestamp = request.args.get('to_timestamp', type=int)
+    order_by = get_order_by()
+    limit = request.args.get('limit', default=0, type=int)
     
-    if on_timestamp:
-        on_dt = datetime.fromtimestamp(on_timestamp/1000)
-        rows = session.execute_async(prepared, (station_id, on_dt,)).result()
-        data = [row for row in rows]
-    elif from_timestamp and to_timestamp:
-        from_dt = datetime.fromtimestamp(from_timestamp/1000)
-        to_dt = datetime.fromtimestamp(to_timestamp/1000)
-        
-        futures = []
-
-        current_date = datetime(from_dt.year, from_dt.month, from_dt.day)
-
-        while (current_date <= to_dt):
-            futures.append(session.execute_async(prepared, (station_id, current_date, from_timestamp, to_timestamp,)))
-            current_date += relativedelta(days=1)
-
-        for future in futures:
-            rows = future.result()
+    def view():
+        data = []
+        results = webcam_photo_results(station_id, from_timestamp, on_timestamp, to_timestamp, order_by, limit,
+            sequential=True)
+        for rows in results:
             for row in rows:
-                data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+                timestamp = datetime_to_epoch_ms(row['timestamp'])
+                data.append(OrderedDict([
+                    ('timestamp', timestamp),
+                    ('size', len(row['photo'] or b'')),
+                    ('url', url_for('get_webcam_photo', station_id=station_id, timestamp=timestamp)),
+                ]))
+        return json.dumps(data, cls=FastEncoder)
+    
+    last_timestamp = on_timestamp or to_timestamp
+    if not last_timestamp:
+        return view()
+    
+    return conditional_response(WEBCAM_PHOTOS_TABLE, last_timestamp, view)
+
+@app.route('/api/webcam_photo/<uuid:station_id>/<int:timestamp>', methods=['GET'])
+def get_webcam_photo(station_id, timestamp):
+    """The bytes of one hourly webcam photo; photos never change once stored."""
+    etag = request_etag(app.config['ETAG_VERSION'], 'webcam_photo', station_id, timestamp)
+    if not is_resource_modified(request.environ, etag=etag):
+        response = Response(status=304)
+    else:
+        prepared = statements.get('hourly_webcam_photo_by_station')
+        rows = list(session.execute_async(prepared,
+            (station_id, partition_key('date', timestamp), timestamp_to_datetime(timestamp),)).result())
+        try:
+            photo = rows[0]['photo']
+        except IndexError:
+            abort(404)
+        if photo is None:
+            abort(404)
+        response = Response(photo, mimetype=image_mimetype(photo))
+    
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['CLOSED_RANGE_MAX_AGE']
+    
+    return response
 
 @app.route('/api/sensors_by_station/<uuid:station_id>', methods=['GET'])
+@shared_metadata('sensors_by_station')
 def get_sensors_by_station(station_id):
-    query = "SELECT * FROM sensors_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('sensors_by_station', (station_id,), station_id=station_id)
     data = [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/parameters_by_station', methods=['GET'])
+@shared_metadata('parameters_by_station')
 def get_parameters_by_station():
     station_id = request.args.get('station_id', type=uuid.UUID)
     
-    query = "SELECT * FROM parameters_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('parameters_by_station', (station_id,), station_id=station_id)
     data =  [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/groups_by_station/<uuid:station_id>', methods=['GET'])
+@shared_metadata('parameter_groups_by_station')
 def get_groups_by_station(station_id):
-    query = "SELECT * FROM parameter_groups_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('parameter_groups_by_station', (station_id,), station_id=station_id)
     data =  [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
     
 @app.route('/api/parameter_sensors_by_station', methods=['GET'])
+@shared_metadata('parameter_sensors_by_station')
 def get_parameter_sensors_by_station():
     station_id = request.args.get('station_id', type=uuid.UUID)
     
-    query = "SELECT * FROM parameter_sensors_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('parameter_sensors_by_station', (station_id,), station_id=station_id)
     data = [row for row in rows]
 
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/groups_by_sensor/<uuid:sensor_id>', methods=['GET'])
+@shared_metadata('parameter_groups_by_sensor')
 def get_groups_by_sensor(sensor_id):
-    query = "SELECT * FROM parameter_groups_by_sensor WHERE sensor_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (sensor_id,)).result()
+    rows = metadata_rows('parameter_groups_by_sensor', (sensor_id,))
     data = [row for row in rows]
 
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/parameters_by_sensor/<uuid:sensor_id>', methods=['GET'])
+@shared_metadata('parameters_by_sensor')
 def get_parameters_by_sensor(sensor_id):
-    query = "SELECT * FROM parameters_by_sensor WHERE sensor_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (sensor_id,)).result()
+    rows = metadata_rows('parameters_by_sensor', (sensor_id,))
     data = [row for row in rows]
 
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/measurement_frequencies_by_sensor_parameter', methods=['GET'])
+@shared_metadata('measurement_frequencies_by_sensor_parameter')
 def get_measurement_frequencies_by_sensor_parameter():
 	sensor_id = request.args.get('sensor_id', type=uuid.UUID)
 	parameter_id = request.args.get('parameter_id', type=uuid.UUID)
 	parameter_type = request.args.get('parameter_type', type=str)
 	
-	query = "SELECT * FROM measurement_frequencies_by_sensor_parameter WHERE sensor_id=? AND parameter_id=? AND parameter_type=?"
-	prepared = session.prepare(query)
-	rows = session.execute_async(prepared, (sensor_id, parameter_id, parameter_type, )).result()
+	rows = metadata_rows('measurement_frequencies_by_sensor_parameter', (sensor_id, parameter_id, parameter_type,))
 	data = [row for row in rows]
 	
-	return json.dumps(data, cls=CustomEncoder)
+	return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/dynamic_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_dynamic_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
+    """Group measurements from the finest stored frequency within budget, see frequencies.py."""
+    rows = metadata_rows('group_measurement_frequencies_by_station_group', (station_id, group_id,), station_id)
+    frequencies = (rows[0].get('measurement_frequencies') or []) if rows else []
     
-    frequencies_query = "SELECT * FROM group_measurement_frequencies_by_station WHERE station_id=? AND group_id=?"
-    prepared_frequencies_query = session.prepare(frequencies_query)
-    frequencies_rows = session.execute_async(prepared_frequencies_query, (station_id, group_id,)).result()
-    frequencies = []
+    selected = select_frequency(frequencies, GROUPED_TABLES, from_timestamp, to_timestamp,
+        app.config['DYNAMIC_MAX_POINTS'], app.config['DYNAMIC_MAX_PARTITIONS'],
+        context='station {} group {}'.format(station_id, group_id))
+    if selected is None:
+        return json.dumps([], cls=FastEncoder)
     
-    try:
-        frequencies_row = frequencies_rows[0]
-    except IndexError as e:
-        print(e)
-    else:
-        frequencies = frequencies_row.get('measurement_frequencies', [])
-        
-    if not frequencies:
-        return json.dumps([], cls=CustomEncoder)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    delta = to_dt - from_dt
-
-    if delta.days < 12: # delta < 12 days
-        if delta.days < 6: # delta < 6 days
-            if delta.days < 4: # delta < 4 days
-                if delta.days < 3: # delta < 3 days
-                    if delta.days < 2:  # delta < 2 days
-                        if delta.days < 1:  # delta < 1 days
-                            if delta.seconds < (60 * 60 * 5): # delta < 5 hours                             
-                                if delta.seconds < (60 * 5):    # delta < 5 minutes
-                                    if '1 Sec' in frequencies:
-                                        return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '1 Min' in frequencies:
-                                        return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '5 Min' in frequencies:
-                                        return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '10 Min' in frequencies:
-                                        return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '15 Min' in frequencies:
-                                        return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '20 Min' in frequencies:
-                                        return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '30 Min' in frequencies:
-                                        return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif 'Hourly' in frequencies:
-                                        return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif 'Daily' in frequencies:
-                                        return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                else:   # 5 hours > delta >= 5 minutes
-                                    if '1 Min' in frequencies:
-                                        return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '1 Sec' in frequencies:
-                                        return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '5 Min' in frequencies:
-                                        return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '10 Min' in frequencies:
-                                        return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '15 Min' in frequencies:
-                                        return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '20 Min' in frequencies:
-                                        return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif '30 Min' in frequencies:
-                                        return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif 'Hourly' in frequencies:
-                                        return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                    elif 'Daily' in frequencies:
-                                        return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            else:   # 1 days > delta >= 5 hours 
-                                if '5 Min' in frequencies:
-                                    return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                elif '1 Min' in frequencies:
-                                    return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)                                
-                                elif '1 Sec' in frequencies:
-                                    return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                elif '10 Min' in frequencies:
-                                    return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                elif '15 Min' in frequencies:
-                                    return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                elif '20 Min' in frequencies:
-                                    return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                elif '30 Min' in frequencies:
-                                    return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                elif 'Hourly' in frequencies:
-                                    return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                                elif 'Daily' in frequencies:
-                                    return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        else:   # 2 days < delta >= 1 days
-                            if '10 Min' in frequencies:
-                                return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            elif '5 Min' in frequencies:
-                                return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            elif '1 Min' in frequencies:
-                                return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)                                
-                            elif '1 Sec' in frequencies:
-                                return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            elif '15 Min' in frequencies:
-                                return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            elif '20 Min' in frequencies:
-                                return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            elif '30 Min' in frequencies:
-                                return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            elif 'Hourly' in frequencies:
-                                return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                            elif 'Daily' in frequencies:
-                                return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    else:   # 3 days > delta >= 2 days
-                        if '15 Min' in frequencies:
-                            return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        elif '10 Min' in frequencies:
-                            return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        elif '5 Min' in frequencies:
-                            return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        elif '1 Min' in frequencies:
-                            return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)                                
-                        elif '1 Sec' in frequencies:
-                            return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        elif '20 Min' in frequencies:
-                            return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        elif '30 Min' in frequencies:
-                            return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        elif 'Hourly' in frequencies:
-                            return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                        elif 'Daily' in frequencies:
-                            return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                else:   # 4 days > delta >= 3 days
-                    if '20 Min' in frequencies:
-                        return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    elif '15 Min' in frequencies:
-                        return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    elif '10 Min' in frequencies:
-                        return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    elif '5 Min' in frequencies:
-                        return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    elif '1 Min' in frequencies:
-                        return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)                                
-                    elif '1 Sec' in frequencies:
-                        return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    elif '30 Min' in frequencies:
-                        return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    elif 'Hourly' in frequencies:
-                        return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                    elif 'Daily' in frequencies:
-                        return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            else:   # 6 days < delta >= 4 days
-                if '30 Min' in frequencies:
-                    return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                elif '20 Min' in frequencies:
-                    return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                elif '15 Min' in frequencies:
-                    return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                elif '10 Min' in frequencies:
-                    return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                elif '5 Min' in frequencies:
-                    return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                elif '1 Min' in frequencies:
-                    return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)                                
-                elif '1 Sec' in frequencies:
-                    return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                elif 'Hourly' in frequencies:
-                    return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-                elif 'Daily' in frequencies:
-                    return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        else:   # 12 days > delta >= 6 days
-            if 'Hourly' in frequencies:
-                return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif '30 Min' in frequencies:
-                return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif '20 Min' in frequencies:
-                return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif '15 Min' in frequencies:
-                return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif '10 Min' in frequencies:
-                return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif '5 Min' in frequencies:
-                return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif '1 Min' in frequencies:
-                return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif '1 Sec' in frequencies:
-                return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-            elif 'Daily' in frequencies:
-                return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-    else:   # unbound > delta >= 12 days
-        if 'Daily' in frequencies:
-            return get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif 'Hourly' in frequencies:
-            return get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif '30 Min' in frequencies:
-            return get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif '20 Min' in frequencies:
-            return get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif '15 Min' in frequencies:
-            return get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif '10 Min' in frequencies:
-            return get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif '5 Min' in frequencies:
-            return get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif '1 Min' in frequencies:
-            return get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-        elif '1 Sec' in frequencies:
-            return get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp)
-    
-    
-    return json.dumps({}, cls=CustomEncoder)
- 
+    return group_measurements(selected.table.name, station_id, group_id, qc_level, from_timestamp, to_timestamp)
+
+@app.route('/api/dynamic_single_parameter_measurements_by_sensor', methods=['GET'])
+def get_dynamic_single_parameter_measurements_by_sensor():
+    return dynamic_sensor_measurements(SINGLE_PARAMETER_TABLES, 'single')
+
 @app.route('/api/daily_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_daily_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, year, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM daily_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND year=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-                
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('daily_single_measurements_by_sensor')
 
 @app.route('/api/hourly_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_hourly_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, year, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM hourly_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND year=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-                
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('hourly_single_measurements_by_sensor')
 
 
 @app.route('/api/thirty_min_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_thirty_min_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, year, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM thirty_min_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND year=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-                
-    prepared = session.prepare(query)
-        
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('thirty_min_single_measurements_by_sensor')
 
 
 @app.route('/api/twenty_min_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_twenty_min_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, year, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM twenty_min_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND year=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-                
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('twenty_min_single_measurements_by_sensor')
 
 
 @app.route('/api/fifteen_min_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_fifteen_min_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM fifteen_min_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-                
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)    
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('fifteen_min_single_measurements_by_sensor')
 
 @app.route('/api/ten_min_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_ten_min_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM ten_min_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
+    return sensor_measurements('ten_min_single_measurements_by_sensor')
 
-    return json.dumps(data, cls=CustomEncoder)
-        
 @app.route('/api/five_min_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_five_min_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-        
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM five_min_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('five_min_single_measurements_by_sensor')
 
 @app.route('/api/one_min_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_one_min_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, week_first_day, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM one_min_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND week_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    
-    year, week_number, weekday = from_dt.isocalendar()
-    current_first_day_of_week = datetime.strptime('{year} {week_number} 1'.format(year=year, week_number=week_number), '%Y %W %w')
-    while (current_first_day_of_week <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_week, from_timestamp, to_timestamp, )))
-        current_first_day_of_week += relativedelta(weeks=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('one_min_single_measurements_by_sensor')
 
 
 @app.route('/api/one_sec_single_parameter_measurements_by_sensor', methods=['GET'])
 def get_one_sec_single_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, date, timestamp, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM one_sec_single_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND date=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    
-    current_day = datetime(from_dt.year, from_dt.month, from_dt.day)
-    while (current_day <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_day, from_timestamp, to_timestamp, )))
-        current_day += relativedelta(days=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
+    return sensor_measurements('one_sec_single_measurements_by_sensor')
+
+@app.route('/api/dynamic_profile_parameter_measurements_by_sensor', methods=['GET'])
+def get_dynamic_profile_parameter_measurements_by_sensor():
+    return dynamic_sensor_measurements(PROFILE_PARAMETER_TABLES, 'profile')
 
-    return json.dumps(data, cls=CustomEncoder)
-    
 @app.route('/api/daily_profile_parameter_measurements_by_sensor', methods=['GET'])
 def get_daily_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, year, timestamp, vertical_position, unit"
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM daily_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND year=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, year, from_timestamp, to_timestamp,)))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('daily_profile_measurements_by_sensor')
 
 @app.route('/api/hourly_profile_parameter_measurements_by_sensor', methods=['GET'])
 def get_hourly_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, year, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM hourly_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND year=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('hourly_profile_measurements_by_sensor')
 
 @app.route('/api/thirty_min_profile_parameter_measurements_by_sensor', methods=['GET'])
 def get_thirty_min_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM thirty_min_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('thirty_min_profile_measurements_by_sensor')
 
 @app.route('/api/twenty_min_profile_parameter_measurements_by_sensor', methods=['GET'])
 def get_twenty_min_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM twenty_min_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('twenty_min_profile_measurements_by_sensor')
 
 @app.route('/api/fifteen_min_profile_parameter_measurements_by_sensor', methods=['GET'])
 def get_fifteen_min_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM fifteen_min_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('fifteen_min_profile_measurements_by_sensor')
 
 @app.route('/api/ten_min_profile_parameter_measurements_by_sensor', methods=['GET'])
 def get_ten_min_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM ten_min_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? 
-                AND timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
+    return sensor_measurements('ten_min_profile_measurements_by_sensor')
 
-    return json.dumps(data, cls=CustomEncoder)
-    
 @app.route('/api/five_min_profile_parameter_measurements_by_sensor')
 def get_five_min_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, month_first_day, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM five_min_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
+    return sensor_measurements('five_min_profile_measurements_by_sensor')
 
-    return json.dumps(data, cls=CustomEncoder)
-    
 @app.route('/api/one_min_profile_parameter_measurements_by_sensor', methods=['GET'])
 def get_one_min_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, week_first_day, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM one_min_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND week_first_day=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    year, week_number, weekday = from_dt.isocalendar()
-    current_first_day_of_week = datetime.strptime('{year} {week_number} 1'.format(year=year, week_number=week_number), '%Y %W %w')
-    while (current_first_day_of_week <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_first_day_of_week, from_timestamp, to_timestamp, )))
-        current_first_day_of_week += relativedelta(weeks=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
+    return sensor_measurements('one_min_profile_measurements_by_sensor')
 
-    return json.dumps(data, cls=CustomEncoder)
-    
 @app.route('/api/one_sec_profile_parameter_measurements_by_sensor')
 def get_one_sec_profile_parameter_measurements_by_sensor():
-    sensor_id = request.args.get('sensor_id', type=uuid.UUID)
-    parameter_id = request.args.get('parameter_id', type=uuid.UUID)
-    qc_level = request.args.get('qc_level', type=int)
-    from_timestamp = request.args.get('from_timestamp', default=None, type=int)
-    to_timestamp = request.args.get('to_timestamp', default=None, type=int)
-    order_by = request.args.get('order_by', default='DESC', type=str)
-    data_sets = request.args.getlist('data_sets')
-    
-    columns = "sensor_id, parameter_id, qc_level, date, timestamp, vertical_position, unit"
-    
-    try:
-        data_sets = data_sets[0].split(',')
-    except IndexError as e:
-        data_sets = []
-    
-    if not data_sets:
-        columns += ",min, avg, max"
-    
-    if "min" in data_sets:
-        columns += ",min_value"
-    if "avg" in data_sets:
-        columns += ",avg_value"
-    if "max" in data_sets:
-        columns += ",max_value"
-    
-    query = """
-        SELECT {columns} FROM one_sec_profile_measurements_by_sensor WHERE sensor_id=? AND 
-            parameter_id=? AND qc_level=? AND date=? AND timestamp>=? AND 
-                timestamp<=? ORDER BY timestamp {order}""".format(columns=columns, order=order_by)
-    
-    prepared = session.prepare(query)
-    
-    from_timestamp, to_timestamp = make_timestamp_range(from_timestamp, to_timestamp)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_day = datetime(from_dt.year, from_dt.month, from_dt.day)
-    while (current_day <= to_dt):
-        futures.append(session.execute_async(prepared, (sensor_id, parameter_id, qc_level, current_day, from_timestamp, to_timestamp, )))
-        current_day += relativedelta(days=1)
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-
-    return json.dumps(data, cls=CustomEncoder)
+    return sensor_measurements('one_sec_profile_measurements_by_sensor')
 
 @app.route('/api/group_measurement_frequencies_by_station/<uuid:station_id>', methods=['GET'])
+@shared_metadata('group_measurement_frequencies_by_station')
 def get_group_measurement_frequencies_by_station(station_id):
-    query = "SELECT * FROM group_measurement_frequencies_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id, )).result()
+    rows = metadata_rows('group_measurement_frequencies_by_station', (station_id,), station_id=station_id)
     data = [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
     
 @app.route('/api/measurement_frequencies_by_station', methods=['GET'])
+@shared_metadata('measurement_frequencies_by_station')
 def get_measurement_frequencies_by_station():
     station_id = request.args.get('station_id', type=uuid.UUID)
     
-    query = "SELECT * FROM measurement_frequencies_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id, )).result()
+    rows = metadata_rows('measurement_frequencies_by_station', (station_id,), station_id=station_id)
     data = [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/group_parameters_by_station/<uuid:station_id>', methods=['GET'])
+@shared_metadata('group_parameters_by_station')
 def get_group_parameters_by_station(station_id):
-    query = "SELECT * FROM group_parameters_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id, )).result()
+    rows = metadata_rows('group_parameters_by_station', (station_id,), station_id=station_id)
     data =  [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/group_parameters_by_station_group/<uuid:station_id>/<uuid:group_id>', methods=['GET'])
+@shared_metadata('parameters_by_station_group')
 def get_group_parameters_by_station_group(station_id, group_id):
-    query = "SELECT * FROM parameters_by_station_group WHERE station_id=? AND group_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id, group_id, )).result()
+    rows = metadata_rows('parameters_by_station_group', (station_id, group_id,), station_id=station_id)
     data =  [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/daily_group_measurements_by_station/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_date>/<int:to_date>', methods=['GET'])
 def get_daily_group_measurements_by_station(station_id, group_id, qc_level, from_date, to_date):
-    query = "SELECT * FROM daily_parameter_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND date>=? AND date<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_date/1000.0)
-    to_dt = datetime.fromtimestamp(to_date/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_date, to_date, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('daily_parameter_group_measurements_by_station', station_id, group_id, qc_level, from_date, to_date)
 
 @app.route('/api/daily_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_date>/<int:to_date>', methods=['GET'])
 def get_daily_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_date, to_date):
-    query = "SELECT * FROM daily_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND date>=? AND date<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_date/1000.0)
-    to_dt = datetime.fromtimestamp(to_date/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_date, to_date, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('daily_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_date, to_date)
 
 @app.route('/api/daily_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_date>/<int:to_date>', methods=['GET'])
 def get_daily_group_measurements_by_station_chart(station_id, group_id, qc_level, from_date, to_date):
-    query = "SELECT * FROM daily_parameter_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND date>=? AND date<=? ORDER BY date ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_date/1000.0)
-    to_dt = datetime.fromtimestamp(to_date/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_date, to_date, )))
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            parameter_id_str = str(parameter_id)
-            if parameter_id_str not in parameters:
-                parameters[parameter_id_str] = {
-                    'id': parameter_id, 
-                    'qc_level': qc_level,
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id_str]['averages'].append([row.get('date'), row.get('avg_value')])
-            parameters[parameter_id_str]['ranges'].append([row.get('date'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('daily_parameter_group_measurements_by_station', station_id, group_id, qc_level, from_date, to_date)
 
 @app.route('/api/hourly_group_measurements_by_station/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_date_hour>/<int:to_date_hour>/')
 def get_hourly_group_measurements_by_station(station_id, group_id, qc_level, from_date_hour, to_date_hour):
-    query = "SELECT * FROM hourly_parameter_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND date_hour>=? AND date_hour<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_date_hour/1000.0)
-    to_dt = datetime.fromtimestamp(to_date_hour/1000.0)
-
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_date_hour, to_date_hour, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
+    return group_measurements('hourly_parameter_group_measurements_by_station', station_id, group_id, qc_level, from_date_hour, to_date_hour)
 
-    return json.dumps(data, cls=CustomEncoder)
-    
 @app.route('/api/thirty_min_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_thirty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM thirty_min_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('thirty_min_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
 @app.route('/api/twenty_min_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_twenty_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM twenty_min_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
-    
+    return group_measurements('twenty_min_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_timestamp, to_timestamp)
+
 @app.route('/api/fifteen_min_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_fifteen_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM fifteen_min_group_meas_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('fifteen_min_group_meas_by_station_grouped', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
 @app.route('/api/ten_min_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_ten_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM ten_min_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('ten_min_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
 @app.route('/api/hourly_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_date_hour>/<int:to_date_hour>', methods=['GET'])
 def get_hourly_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_date_hour, to_date_hour):
-    query = "SELECT * FROM hourly_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND date_hour>=? AND date_hour<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_date_hour/1000.0)
-    to_dt = datetime.fromtimestamp(to_date_hour/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_date_hour, to_date_hour, )))
-    
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('hourly_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_date_hour, to_date_hour)
 
 @app.route('/api/thirty_min_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>/')
 def get_thirty_min_group_measurements_by_station_chart(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM thirty_min_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND timestamp>=? AND timestamp<=? ORDER BY timestamp ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            parameter_id_str = str(parameter_id)
-            if parameter_id_str not in parameters:
-                parameters[parameter_id_str] = {
-                    'id': parameter_id, 
-                    'qc_level': qc_level,
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id_str]['averages'].append([row.get('timestamp'), row.get('avg_value')])
-            parameters[parameter_id_str]['ranges'].append([row.get('timestamp'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('thirty_min_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
     
 @app.route('/api/twenty_min_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>/')
 def get_twenty_min_group_measurements_by_station_chart(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM twenty_min_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND timestamp>=? AND timestamp<=? ORDER BY timestamp ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            parameter_id_str = str(parameter_id)
-            if parameter_id_str not in parameters:
-                parameters[parameter_id_str] = {
-                    'id': parameter_id, 
-                    'qc_level': qc_level,
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id_str]['averages'].append([row.get('timestamp'), row.get('avg_value')])
-            parameters[parameter_id_str]['ranges'].append([row.get('timestamp'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('twenty_min_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
     
 @app.route('/api/fifteen_min_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>/')
 def get_fifteen_min_group_measurements_by_station_chart(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM fifteen_min_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND timestamp>=? AND timestamp<=? ORDER BY timestamp ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_timestamp, to_timestamp, )))
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            parameter_id_str = str(parameter_id)
-            if parameter_id_str not in parameters:
-                parameters[parameter_id_str] = {
-                    'id': parameter_id, 
-                    'name': parameter_name, 
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id_str]['averages'].append([row.get('timestamp'), row.get('avg_value')])
-            parameters[parameter_id_str]['ranges'].append([row.get('timestamp'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('fifteen_min_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
     
 @app.route('/api/ten_min_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>/')
 def get_ten_min_group_measurements_by_station_chart(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM ten_min_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND timestamp<=? ORDER BY timestamp ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            parameter_id_str = str(parameter_id)
-            if parameter_id_str not in parameters:
-                parameters[parameter_id_str] = {
-                    'id': parameter_id, 
-                    'name': parameter_name, 
-                    'qc_level': qc_level,
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id_str]['averages'].append([row.get('timestamp'), row.get('avg_value')])
-            parameters[parameter_id_str]['ranges'].append([row.get('timestamp'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('ten_min_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
     
 @app.route('/api/one_min_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>')
 def get_one_min_group_measurements_by_station_chart(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM one_min_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND week_first_day=? AND timestamp>=? AND timestamp<=? ORDER BY timestamp ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    
-    year, week_number, weekday = from_dt.isocalendar()
-    current_first_day_of_week = datetime.strptime('{} {} 1'.format(year, week_number), '%Y %W %w')
-    while (current_first_day_of_week <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_first_day_of_week, from_timestamp, to_timestamp, )))
-        current_first_day_of_week += relativedelta(weeks=1)
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            parameter_id_str = str(parameter_id)
-            if parameter_id_str not in parameters:
-                parameters[parameter_id_str] = {
-                    'id': parameter_id, 
-                    'name': parameter_name, 
-                    'qc_level': qc_level,
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id_str]['averages'].append([row.get('timestamp'), row.get('avg_value')])
-            parameters[parameter_id_str]['ranges'].append([row.get('timestamp'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('one_min_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
     
 @app.route('/api/one_sec_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>/')
 def get_one_sec_group_measurements_by_station_chart(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM one_sec_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND date=? AND timestamp>=? AND timestamp<=? ORDER BY timestamp ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_day = datetime(from_dt.year, from_dt.month, from_dt.day)
-    while (current_day <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_day, from_timestamp, to_timestamp, )))
-        current_day += relativedelta(days=1)
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            parameter_id_str = str(parameter_id)
-            if parameter_id_str not in parameters:
-                parameters[parameter_id_str] = {
-                    'id': parameter_id, 
-                    'qc_level': qc_level,
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id_str]['averages'].append([row.get('timestamp'), row.get('avg_value')])
-            parameters[parameter_id_str]['ranges'].append([row.get('timestamp'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('one_sec_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
 @app.route('/api/hourly_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_date_hour>/<int:to_date_hour>/')
 def get_hourly_group_measurements_by_station_chart(station_id, group_id, qc_level, from_date_hour, to_date_hour):
-    query = "SELECT * FROM hourly_parameter_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND year=? AND date_hour>=? AND date_hour<=? ORDER BY date_hour ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_date_hour/1000.0)
-    to_dt = datetime.fromtimestamp(to_date_hour/1000.0)
-    
-    futures = []
-    for year in range(from_dt.year, to_dt.year + 1):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, year, from_date_hour, to_date_hour, )))
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            if parameter_id not in parameters:
-                parameters[parameter_id] = {
-                    'id': parameter_id, 
-                    'qc_level': qc_level,
-                    'unit': parameter_unit,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id]['averages'].append([row.get('date_hour'), row.get('avg_value')])
-            parameters[parameter_id]['ranges'].append([row.get('date_hour'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('hourly_parameter_group_measurements_by_station', station_id, group_id, qc_level, from_date_hour, to_date_hour)
 
     
 @app.route('/api/five_min_group_measurements_by_station/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_five_min_group_measurements_by_station(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM five_min_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('five_min_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
 @app.route('/api/five_min_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_five_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM five_min_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
+    return group_measurements('five_min_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
-    
 @app.route('/api/one_min_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_one_min_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    
-    query = "SELECT * FROM one_min_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND week_first_day=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    year, week_number, weekday = from_dt.isocalendar()
-    current_first_day_of_week = datetime.strptime('{} {} 1'.format(year, week_number), '%Y %W %w')
-    while (current_first_day_of_week <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_first_day_of_week, from_timestamp, to_timestamp, )))
-        current_first_day_of_week += relativedelta(weeks=1)
+    return group_measurements('one_min_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
-    
 @app.route('/api/one_sec_group_measurements_by_station_time_grouped/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>', methods=['GET'])
 def get_one_sec_group_measurements_by_station_time_grouped(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    
-    query = "SELECT * FROM one_sec_group_measurements_by_station_grouped WHERE station_id=? AND group_id=? AND qc_level=? AND date=? AND timestamp>=? AND timestamp<=?"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-    current_date = datetime(from_dt.year, from_dt.month, from_dt.day)
-    while (current_date <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_date, from_timestamp, to_timestamp, )))
-        current_date += relativedelta(days=1)
-
-    data = []
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            data.append(row)
-    
-    return json.dumps(data, cls=CustomEncoder)
+    return group_measurements('one_sec_group_measurements_by_station_grouped', station_id, group_id, qc_level, from_timestamp, to_timestamp)
 
 @app.route('/api/five_min_group_measurements_by_station_chart/<uuid:station_id>/<uuid:group_id>/<int:qc_level>/<int:from_timestamp>/<int:to_timestamp>/')
 def get_five_min_group_measurements_by_station_chart(station_id, group_id, qc_level, from_timestamp, to_timestamp):
-    query = "SELECT * FROM five_min_group_measurements_by_station WHERE station_id=? AND group_id=? AND qc_level=? AND month_first_day=? AND timestamp>=? AND timestamp<=? ORDER BY timestamp ASC"
-    prepared = session.prepare(query)
-    
-    from_dt = datetime.fromtimestamp(from_timestamp/1000.0)
-    to_dt = datetime.fromtimestamp(to_timestamp/1000.0)
-    
-    futures = []
-
-    current_first_day_of_month = datetime(from_dt.year, from_dt.month, 1)
-    while (current_first_day_of_month <= to_dt):
-        futures.append(session.execute_async(prepared, (station_id, group_id, qc_level, current_first_day_of_month, from_timestamp, to_timestamp, )))
-        current_first_day_of_month += relativedelta(months=1)
-    
-    parameters = OrderedDict()
-
-    for future in futures:
-        rows = future.result()
-        for row in rows:
-            parameter_id = row.get('parameter_id')
-            parameter_unit = row.get('unit')
-            if parameter_id not in parameters:
-                parameters[parameter_id] = {
-                    'id': parameter_id, 
-                    'unit': parameter_unit,
-                    'qc_level': qc_level,
-                    'averages': [],
-                    'ranges': []
-                }
-
-            parameters[parameter_id]['averages'].append([row.get('timestamp'), row.get('avg_value')])
-            parameters[parameter_id]['ranges'].append([row.get('timestamp'), row.get('min_value'), row.get('max_value')])
-
-    return json.dumps(parameters, cls=CustomEncoder)
+    return group_chart('five_min_group_measurements_by_station', station_id, group_id, qc_level, from_timestamp, to_timestamp)
     
 @app.route('/api/group_qc_levels_by_station/<uuid:station_id>', methods=['GET'])
+@shared_metadata('group_qc_levels_by_station')
 def get_group_qc_levels_by_station(station_id):
-    query = "SELECT * FROM group_qc_levels_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('group_qc_levels_by_station', (station_id,), station_id=station_id)
     data = [row for row in rows]
 
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/measurement_frequencies_by_station_parameter', methods=['GET'])
+@shared_metadata('measurement_frequencies_by_station_parameter')
 def get_measurement_frequencies_by_station_parameter():
     station_id = request.args.get('station_id', type=uuid.UUID)
     parameter_id = request.args.get('parameter_id', type=uuid.UUID)
     parameter_type = request.args.get('parameter_type', type=uuid.UUID)
     
-    query = """SELECT * FROM measurement_frequencies_by_station_parameter WHERE station_id=? AND 
-        parameter_id=? AND parameter_type=?"""
-
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id, parameter_id, parameter_type,)).result()
+    rows = metadata_rows('measurement_frequencies_by_station_parameter', (station_id, parameter_id, parameter_type,), station_id=station_id)
     data = [row for row in rows]
 
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
 @app.route('/api/parameter_measurement_frequencies_by_station/<uuid:station_id>', methods=['GET'])
+@shared_metadata('parameter_measurement_frequencies_by_station')
 def get_parameter_measurement_frequencies_by_station(station_id):
-    query = "SELECT * FROM parameter_measurement_frequencies_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id, )).result()
+    rows = metadata_rows('parameter_measurement_frequencies_by_station', (station_id,), station_id=station_id)
     data = [row for row in rows]
     
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
     
 @app.route('/api/parameter_qc_levels_by_station/<uuid:station_id>', methods=['GET'])
+@shared_metadata('parameter_qc_levels_by_station')
 def get_parameter_qc_levels_by_station(station_id):
-    query = "SELECT * FROM parameter_qc_levels_by_station WHERE station_id=?"
-    prepared = session.prepare(query)
-    rows = session.execute_async(prepared, (station_id,)).result()
+    rows = metadata_rows('parameter_qc_levels_by_station', (station_id,), station_id=station_id)
     data = [row for row in rows]
 
-    return json.dumps(data, cls=CustomEncoder)
+    return json.dumps(data, cls=FastEncoder)
 
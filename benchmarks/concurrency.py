@@ -0,0 +1,106 @@
+"""
+    Concurrency load test.
+
+    Keeps a number of clients requesting the same slow range over and over
+    from one or more running deployments and reports the throughput and
+    latency of each at every concurrency level. With the prefork workers of
+    hydroview-flaskrestapi.ini at most one request per process waits on
+    Cassandra at a time, so latency grows with the clients beyond the
+    process count while throughput stays flat; the gevent workers of
+    hydroview-flaskrestapi-gevent.ini keep serving the waiting requests
+    together until Cassandra itself is the limit.
+
+    Usage, from the repository root, with both deployments serving HTTP:
+
+        uwsgi --ini hydroview-flaskrestapi.ini --http :8000
+        uwsgi --ini hydroview-flaskrestapi-gevent.ini --http :8001
+        python -m benchmarks.concurrency \\
+            --target prefork=http://127.0.0.1:8000 --target gevent=http://127.0.0.1:8001 \\
+            --path '/api/one_min_single_parameter_measurements_by_sensor?sensor_id=...&from_timestamp=...' \\
+            [--concurrency 5,50,200,500] [--duration 20]
+
+    Pick a range whose partitions have not all ended, otherwise the
+    responses are served from the shared cache instead of Cassandra.
+"""
+
+import argparse
+import threading
+import time
+
+try:
+    from urllib.request import urlopen
+except ImportError:
+    from urllib2 import urlopen
+
+
+def percentile(latencies, fraction):
+    if not latencies:
+        return float('nan')
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+def run_level(url, concurrency, duration, timeout):
+    """(requests per second, median latency, 99th percentile latency, errors) of ``concurrency`` clients."""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def client():
+        while time.time() < deadline:
+            started = time.time()
+            try:
+                response = urlopen(url, timeout=timeout)
+                try:
+                    response.read()
+                finally:
+                    response.close()
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies.append(time.time() - started)
+
+    clients = [threading.Thread(target=client) for i in range(concurrency)]
+    started = time.time()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+    return len(latencies) / elapsed, percentile(latencies, 0.5), percentile(latencies, 0.99), errors[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, help="name=base URL of a deployment")
+    parser.add_argument('--path', required=True, help="request to repeat, with its query string")
+    parser.add_argument('--concurrency', default='5,50,200,500')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--timeout', type=float, default=60)
+    args = parser.parse_args()
+
+    targets = [target.split('=', 1) for target in args.target]
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    print("{:<10} {:>8} {:>10} {:>10} {:>10} {:>8}".format('target', 'clients', 'req/s', 'p50 ms', 'p99 ms', 'errors'))
+    results = {}
+    for level in levels:
+        for name, base_url in targets:
+            throughput, p50, p99, errors = run_level(base_url.rstrip('/') + args.path, level, args.duration,
+                args.timeout)
+            results[(name, level)] = throughput
+            print("{:<10} {:>8} {:>10.1f} {:>10.0f} {:>10.0f} {:>8}".format(
+                name, level, throughput, p50 * 1000, p99 * 1000, errors))
+
+    if len(targets) > 1:
+        baseline = targets[0][0]
+        for name, base_url in targets[1:]:
+            for level in levels:
+                if results[(baseline, level)]:
+                    print("{} over {} at {} clients: {:.2f}x".format(
+                        name, baseline, level, results[(name, level)] / results[(baseline, level)]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+    JSON encoder micro-benchmark.
+
+    Encodes rows shaped like those of the ten minute single parameter
+    measurement table with CustomEncoder and FastEncoder and reports the
+    throughput of each in rows per second.
+
+    Usage, from the repository root:
+
+        python -m benchmarks.encoders [--rows 50000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import timeit
+import uuid
+
+from datetime import datetime, timedelta
+
+from cassandra.util import Date
+
+from utils import CustomEncoder, FastEncoder
+
+
+def measurement_rows(count):
+    sensor_id = uuid.uuid4()
+    parameter_id = uuid.uuid4()
+    start = datetime(2017, 1, 1)
+    rows = []
+    for i in range(count):
+        timestamp = start + timedelta(minutes=10 * i)
+        avg_value = random.uniform(-5.0, 25.0)
+        rows.append({
+            'sensor_id': sensor_id,
+            'parameter_id': parameter_id,
+            'qc_level': 1,
+            'month_first_day': Date(timestamp.date().replace(day=1)),
+            'timestamp': timestamp,
+            'unit': 'C',
+            'min_value': avg_value - random.random(),
+            'avg_value': avg_value,
+            'max_value': avg_value + random.random(),
+        })
+
+    return rows
+
+def rows_per_second(cls, rows, repeat):
+    best = min(timeit.repeat(lambda: json.dumps(rows, cls=cls), number=1, repeat=repeat))
+    return len(rows) / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = measurement_rows(args.rows)
+    results = [(cls.__name__, rows_per_second(cls, rows, args.repeat)) for cls in (CustomEncoder, FastEncoder)]
+
+    for name, throughput in results:
+        print("{name:<14} {throughput:>12,.0f} rows/s".format(name=name, throughput=throughput))
+    print("{name:<14} {speedup:>12.2f}x".format(name='speedup', speedup=results[1][1] / results[0][1]))
+
+if __name__ == '__main__':
+    main()
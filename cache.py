@@ -0,0 +1,102 @@
+"""
+    In-process caches.
+
+    ``TTLCache`` is a bounded LRU mapping whose entries also expire after a
+    time to live given per entry. It is bounded by its number of entries or,
+    given a ``sizeof`` function, by the total size of its values. Entries
+    carry an optional tag, the station they describe for instance, so that
+    related entries can be dropped together when the underlying data changes.
+"""
+
+import threading
+import time
+
+from collections import OrderedDict
+
+
+class TTLCache(object):
+
+    def __init__(self, max_size=1024, clock=time.monotonic, sizeof=None):
+        self.max_size = max(1, max_size)
+        self.clock = clock
+        self.sizeof = sizeof
+        self.size = 0
+        self._entries = OrderedDict()    # key -> (value, expires at or None, tag, size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires_at, tag, size = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at is not None and expires_at <= self.clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _remove(self, key):
+        self.size -= self._entries.pop(key)[3]
+
+    def set(self, key, value, ttl=None, tag=None):
+        """Store ``value`` for ``ttl`` seconds, or until evicted when ``ttl`` is None."""
+        size = self.sizeof(value) if self.sizeof else 1
+        if size > self.max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, None if ttl is None else self.clock() + ttl, tag, size)
+            self.size += size
+            while self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate(self, tags):
+        """Drop every entry tagged with one of ``tags``; returns how many were dropped."""
+        tags = set(tags)
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry[2] in tags]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self.size = 0
+            self.invalidations += count
+            return count
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
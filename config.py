@@ -9,6 +9,39 @@ class Config(object):
     TESTING = False
     CSRF_ENABLED = True
     SECRET_KEY = 'this-really-needs-to-be-changed'
+    FANOUT_MAX_IN_FLIGHT_PER_REQUEST = 8    # Partition queries in flight for one request
+    FANOUT_MAX_IN_FLIGHT_PER_PROCESS = 64    # Partition queries in flight across a worker
+    ASGI_MAX_IN_FLIGHT_PER_PROCESS = 256    # Partition queries in flight across an ASGI process, see app/asgi.py
+    ASGI_WSGI_THREADS = 32    # Threads serving the requests an ASGI process hands to Flask, streams included
+    MAX_PAGE_SIZE = 10000    # Upper bound for the page_size of paged measurement requests
+    RESAMPLE_MAX_SOURCE_ROWS = 1000000    # Upper bound for the stored rows a resample request may read per series
+    BATCH_MAX_SERIES = 50    # Upper bound for the series of one batch measurements request
+    DYNAMIC_MAX_POINTS = 300    # Rows per series the dynamic endpoints aim to return at most
+    DYNAMIC_MAX_PARTITIONS = 64    # Partitions the dynamic endpoints aim to query at most
+    INGESTION_LAG = 3600    # Seconds rows may arrive after their bucket has ended, see settle_ms in app/views.py
+    CLOSED_RANGE_MAX_AGE = 31536000    # Seconds a measurement response over closed partitions may be reused
+    OPEN_RANGE_MAX_AGE = 60    # Seconds a measurement response touching the current partition may be reused
+    ETAG_VERSION = '1'    # Bump when the encoding of a response changes to invalidate cached ETags
+    METADATA_CACHE_MAX_ENTRIES = 4096    # Metadata query results kept per worker
+    METADATA_CACHE_TTL = 600    # Seconds a cached metadata query result is served
+    METADATA_CACHE_TTLS = {    # Per statement overrides of METADATA_CACHE_TTL
+        'stations': 3600,
+        'station_info_by_station': 3600,
+        'webcam_live_urls_by_station': 300,
+    }
+    SHARED_CACHE_NAME = 'hydroview'    # uWSGI cache shared by the workers, see hydroview-flaskrestapi.ini
+    SHARED_CACHE_MAX_BYTES = 64 * 1024 * 1024    # Size of the per process fallback when the uWSGI cache is missing
+    SHARED_CACHE_MEASUREMENTS_TTL = 86400    # Seconds a response over closed partitions stays in the shared cache
+    PARTITION_CACHE_MAX_ROWS = 250000    # Rows of closed partitions kept per worker
+    LATEST_REFRESH_INTERVAL = 60    # Seconds between refreshes of the latest value index, see latest.py
+    LATEST_QC_LEVEL = 0    # QC level of the series in the latest value index
+    LATEST_STATION_BUCKET = 0    # Bucket of the station list refreshed by the latest value index
+    STREAM_POLL_INTERVAL = 10    # Seconds between the reads of a followed station group, see streams.py
+    STREAM_QUEUE_SIZE = 100    # Messages buffered per stream client before it is disconnected
+    STREAM_KEEPALIVE = 15    # Seconds after which an idle stream sends a comment to keep the connection open
+    STREAM_MAX_SUBSCRIPTIONS = 8    # Streams a synchronous worker process serves at once, see stream_limit in app/__init__.py
+    ASGI_MAX_STREAMS = 16    # Streams an ASGI process serves at once, each on one of its ASGI_WSGI_THREADS
+    ADMIN_TOKEN = os.environ.get('HYDROVIEW_ADMIN_TOKEN')    # X-Admin-Token of the admin endpoints, disabled when unset
 
 
 class ProductionConfig(Config):
@@ -0,0 +1,67 @@
+"""
+    Chart downsampling.
+
+    ``downsample_chart`` reduces a chart series to at most ``max_points``
+    points. The series is split into Largest-Triangle-Three-Buckets buckets:
+    the first and the last point each get their own and the points between
+    them are divided evenly over the rest. LTTB picks the point of every
+    bucket that best keeps the shape of the averages, and the ranges of the
+    bucket are merged into the envelope of its lowest minimum and highest
+    maximum, so peaks dropped from the averages still show in the ranges.
+"""
+
+import numpy as np
+
+
+def float_array(values):
+    return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+def nullable_list(array):
+    return [None if np.isnan(value) else value for value in array.tolist()]
+
+def bucket_bounds(length, max_points):
+    """Start indexes of ``max_points`` buckets over ``length`` points, followed by ``length``."""
+    middle = np.floor(np.linspace(1, length - 1, max_points - 1)).astype(int)
+    return np.concatenate(([0], middle, [length]))
+
+def lttb_indexes(x, y, bounds):
+    """Index of the point LTTB selects in each bucket; NaN averages are never selected over numbers."""
+    buckets = len(bounds) - 1
+    selected = np.empty(buckets, dtype=int)
+    selected[0] = 0
+    selected[-1] = len(x) - 1
+
+    a = 0
+    for i in range(1, buckets - 1):
+        start, end, next_end = bounds[i], bounds[i + 1], bounds[i + 2]
+
+        next_y = y[end:next_end]
+        next_y = next_y[~np.isnan(next_y)]
+        average_x = x[end:next_end].mean()
+        average_y = next_y.mean() if len(next_y) else y[a]
+
+        # Twice the area of the triangles (a, candidate, average of the next bucket).
+        areas = np.abs((x[a] - average_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (average_y - y[a]))
+        areas[np.isnan(areas)] = -1
+
+        a = start + int(np.argmax(areas))
+        selected[i] = a
+
+    return selected
+
+def downsample_chart(timestamps, avg_values, min_values, max_values, max_points):
+    """(timestamps, avg_values, min_values, max_values) reduced to at most ``max_points`` points."""
+    length = len(timestamps)
+    if max_points < 3 or length <= max_points:
+        return timestamps, avg_values, min_values, max_values
+
+    x = np.array(timestamps, dtype='datetime64[ms]').astype('int64').astype(float)
+    y = float_array(avg_values)
+    bounds = bucket_bounds(length, max_points)
+
+    indexes = lttb_indexes(x, y, bounds)
+    lows = np.fmin.reduceat(float_array(min_values), bounds[:-1])
+    highs = np.fmax.reduceat(float_array(max_values), bounds[:-1])
+
+    return ([timestamps[i] for i in indexes], [avg_values[i] for i in indexes], nullable_list(lows),
+        nullable_list(highs))
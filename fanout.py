@@ -0,0 +1,123 @@
+"""
+    Bounded concurrency for partition fan-out.
+
+    A wide range query turns into one CQL query per partition. Firing all of
+    them at once floods the coordinator and the driver's request slots for
+    every other request served by the worker, so ``FanoutExecutor`` keeps at
+    most ``max_per_request`` of a request's queries and ``max_per_process``
+    queries overall in flight, and hands results back in partition order.
+"""
+
+import threading
+
+from collections import deque
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+class FanoutExecutor(object):
+
+    def __init__(self, session, max_per_request=8, max_per_process=64):
+        self.session = session
+        self.max_per_request = max(1, max_per_request)
+        self.max_per_process = max(1, max_per_process)
+        self._slots = threading.BoundedSemaphore(self.max_per_process)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self.queued,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'max_per_request': self.max_per_request,
+                'max_per_process': self.max_per_process,
+            }
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    # The driver runs a future's callbacks again for every further page it
+    # fetches while the result set is iterated; ``settled`` is acquired by the
+    # first of them only, so a query gives back its slot exactly once.
+
+    def _finished(self, rows, index, future, done, settled):
+        if not settled.acquire(False):
+            return
+        self._slots.release()
+        self._count(in_flight=-1, completed=1)
+        done.put((index, future, None))
+
+    def _failed(self, error, index, future, done, settled):
+        if not settled.acquire(False):
+            return
+        self._slots.release()
+        self._count(in_flight=-1, failed=1)
+        done.put((index, future, error))
+
+    def _submit(self, statement, parameters, index, done, execute_kwargs):
+        self._count(queued=-1, in_flight=1)
+        try:
+            future = self.session.execute_async(statement, parameters, **execute_kwargs)
+        except Exception:
+            self._slots.release()
+            self._count(in_flight=-1, failed=1)
+            raise
+        settled = threading.Lock()
+        future.add_callbacks(
+            self._finished, self._failed,
+            callback_args=(index, future, done, settled), errback_args=(index, future, done, settled))
+
+    def execute(self, statement, parameters_list, **execute_kwargs):
+        """Run ``statement`` once per parameter tuple.
+
+        Generates the result sets in the order of ``parameters_list``; each is
+        yielded as soon as it and every result before it completed. Keyword
+        arguments are passed on to ``Session.execute_async``.
+        """
+        return self.execute_many([(statement, parameters) for parameters in parameters_list], **execute_kwargs)
+
+    def execute_many(self, queries, **execute_kwargs):
+        """Like ``execute`` for a list of (statement, parameters) pairs."""
+        queries = list(queries)
+        pending = deque(enumerate(queries))
+        self._count(queued=len(pending))
+
+        done = queue.Queue()
+        completed = {}
+        in_flight = 0
+        next_index = 0
+
+        try:
+            while next_index < len(queries):
+                while pending and in_flight < self.max_per_request:
+                    # Only wait for a process slot when this request has nothing
+                    # running; otherwise consume its own results first.
+                    if not self._slots.acquire(in_flight == 0):
+                        break
+                    index, (statement, parameters) = pending.popleft()
+                    in_flight += 1
+                    self._submit(statement, parameters, index, done, execute_kwargs)
+
+                index, future, error = done.get()
+                in_flight -= 1
+                completed[index] = (future, error)
+
+                while next_index in completed:
+                    future, error = completed.pop(next_index)
+                    if error is not None:
+                        raise error
+                    next_index += 1
+                    yield future.result()
+        finally:
+            self._count(queued=-len(pending))
@@ -0,0 +1,97 @@
+"""
+    Measurement frequency selection.
+
+    Dynamic endpoints serve a range from whichever of the measurement
+    frequencies stored for a station group or sensor parameter is finest
+    while still within budget. For every available frequency the rows a
+    series would return over the range and the partitions that would be
+    queried for them are estimated, and the finest frequency within both the
+    point and the partition budget is selected. When none is, the coarsest available frequency is used.
+
+    Clients may instead ask for a point density: the coarsest, and so
+    cheapest, frequency that still returns that many rows over the range is
+    then selected, or the finest available one when none does.
+
+    Every decision is logged with its estimates so that the budgets, set in
+    config.py, can be tuned from the logs.
+"""
+
+import logging
+
+from collections import namedtuple
+
+from partitions import partition_keys
+from statements import table_resolution
+
+log = logging.getLogger(__name__)
+
+# Seconds between the rows of each frequency named in the frequency tables.
+FREQUENCIES = {
+    '1 Sec': 1,
+    '1 Min': 60,
+    '5 Min': 300,
+    '10 Min': 600,
+    '15 Min': 900,
+    '20 Min': 1200,
+    '30 Min': 1800,
+    'Hourly': 3600,
+    'Daily': 86400,
+}
+
+Estimate = namedtuple('Estimate', 'frequency table rows partitions')
+
+
+def estimate(frequency, table, from_timestamp, to_timestamp):
+    """Rows of one series and partitions of ``table`` in ``[from_timestamp, to_timestamp]``."""
+    if from_timestamp > to_timestamp:
+        return Estimate(frequency, table, 0, 0)
+    rows = (to_timestamp - from_timestamp) // (table_resolution(table) * 1000) + 1
+    partitions = len(partition_keys(table.partition_column, from_timestamp, to_timestamp))
+
+    return Estimate(frequency, table, rows, partitions)
+
+def estimates(frequencies, tables, from_timestamp, to_timestamp):
+    """Estimates of the known ``frequencies`` that have a table in ``tables``, finest first."""
+    tables_by_resolution = dict((table_resolution(table), table) for table in tables)
+    available = []
+    for frequency in set(frequencies):
+        table = tables_by_resolution.get(FREQUENCIES.get(frequency))
+        if table is not None:
+            available.append(estimate(frequency, table, from_timestamp, to_timestamp))
+
+    return sorted(available, key=lambda item: table_resolution(item.table))
+
+def describe(candidates):
+    return ', '.join(
+        '{}: {} rows in {} partitions'.format(item.frequency, item.rows, item.partitions) for item in candidates)
+
+def select_frequency(frequencies, tables, from_timestamp, to_timestamp, max_points, max_partitions, context=''):
+    """Estimate of the frequency to serve the range from, or None when no frequency is available."""
+    candidates = estimates(frequencies, tables, from_timestamp, to_timestamp)
+    if not candidates:
+        log.info("No measurement frequency available for %s among %s", context, list(frequencies))
+        return None
+
+    within_budget = [item for item in candidates if item.rows <= max_points and item.partitions <= max_partitions]
+    selected = within_budget[0] if within_budget else candidates[-1]
+
+    log.info("Selected %s for %s over %d ms (budget %d points, %d partitions; candidates %s)",
+        selected.frequency, context, to_timestamp - from_timestamp, max_points, max_partitions,
+        describe(candidates))
+
+    return selected
+
+def select_density(frequencies, tables, from_timestamp, to_timestamp, min_points, context=''):
+    """Estimate of the coarsest frequency with ``min_points`` rows in the range, or None when none is available."""
+    candidates = estimates(frequencies, tables, from_timestamp, to_timestamp)
+    if not candidates:
+        log.info("No measurement frequency available for %s among %s", context, list(frequencies))
+        return None
+
+    dense_enough = [item for item in candidates if item.rows >= min_points]
+    selected = dense_enough[-1] if dense_enough else candidates[0]
+
+    log.info("Selected %s for %s over %d ms (density %d points; candidates %s)",
+        selected.frequency, context, to_timestamp - from_timestamp, min_points, describe(candidates))
+
+    return selected
@@ -0,0 +1,184 @@
+"""
+    Latest values.
+
+    ``LatestIndex`` keeps the newest measurement of every single parameter
+    series of the stations in memory so that live overviews are served
+    without querying Cassandra. A series is read from the finest frequency
+    stored for it, with one ``LIMIT 1`` query on its newest partition, or on
+    the partition before when the newest one has no rows yet.
+
+    A background thread refreshes every station of the station list, and
+    every other station requested since, once per interval. Each worker
+    process keeps its own index.
+"""
+
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+
+from frequencies import FREQUENCIES
+from partitions import partition_key, partition_span
+from resampling import epoch_ms
+from statements import SINGLE_PARAMETER_TABLES, table_resolution
+
+log = logging.getLogger(__name__)
+
+TABLES_BY_RESOLUTION = dict((table_resolution(table), table) for table in SINGLE_PARAMETER_TABLES)
+
+
+def finest_table(frequencies):
+    """(frequency, table) of the finest of ``frequencies`` with a single parameter table, or None."""
+    known = [frequency for frequency in frequencies or () if FREQUENCIES.get(frequency) in TABLES_BY_RESOLUTION]
+    if not known:
+        return None
+    frequency = min(known, key=FREQUENCIES.get)
+
+    return frequency, TABLES_BY_RESOLUTION[FREQUENCIES[frequency]]
+
+def previous_partition(partition_column, partition):
+    start, _ = partition_span(partition_column, partition)
+    return partition_key(partition_column, start - 1)
+
+
+class LatestIndex(object):
+
+    def __init__(self, session, fanout, statements, qc_level=0, interval=60, station_bucket=0, clock=time.time):
+        self.session = session
+        self.fanout = fanout
+        self.statements = statements
+        self.qc_level = qc_level
+        self.interval = interval
+        self.station_bucket = station_bucket
+        self.clock = clock
+        self._stations = {}    # station id -> (refreshed at in epoch ms, list of latest values)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def series(self, station_id):
+        """(sensor_id, parameter_id, frequency, table) of every single parameter series of a station."""
+        rows = self.session.execute(self.statements.get('measurement_frequencies_by_station'), (station_id,))
+        for row in rows:
+            if row['parameter_type'] != 'single':
+                continue
+            finest = finest_table(row['measurement_frequencies'])
+            if finest is not None:
+                yield (row['sensor_id'], row['parameter_id']) + finest
+
+    def _query(self, series, partitions):
+        queries = [
+            (self.statements.get(table.name, latest=True), (sensor_id, parameter_id, self.qc_level, partition))
+                for (sensor_id, parameter_id, frequency, table), partition in zip(series, partitions)]
+        return [list(rows) for rows in self.fanout.execute_many(queries)]
+
+    def refresh_station(self, station_id):
+        """Read the latest values of a station into the index and return them."""
+        now = int(self.clock() * 1000)
+        series = list(self.series(station_id))
+        partitions = [partition_key(table.partition_column, now) for sensor_id, parameter_id, frequency, table in series]
+        results = self._query(series, partitions)
+
+        empty = [index for index, rows in enumerate(results) if not rows]
+        if empty:
+            retried = self._query([series[index] for index in empty], [
+                previous_partition(series[index][3].partition_column, partitions[index]) for index in empty])
+            for index, rows in zip(empty, retried):
+                results[index] = rows
+
+        with self._lock:
+            entry = self._stations.get(station_id)
+        previous = dict(((value['sensor_id'], value['parameter_id']), value) for value in entry[1]) if entry else {}
+
+        values = []
+        for (sensor_id, parameter_id, frequency, table), rows in zip(series, results):
+            if rows:
+                row = rows[0]
+                values.append(OrderedDict([
+                    ('sensor_id', sensor_id),
+                    ('parameter_id', parameter_id),
+                    ('qc_level', self.qc_level),
+                    ('frequency', frequency),
+                    ('timestamp', epoch_ms(row[table.time_column])),
+                    ('unit', row['unit']),
+                    ('avg_value', row['avg_value']),
+                    ('min_value', row['min_value']),
+                    ('max_value', row['max_value']),
+                ]))
+            elif (sensor_id, parameter_id) in previous:
+                # Keep what was seen before the series went quiet for a partition.
+                values.append(previous[(sensor_id, parameter_id)])
+
+        entry = (now, values)
+        if series:
+            with self._lock:
+                self._stations[station_id] = entry
+                self.refreshes += 1
+
+        return entry
+
+    def get(self, station_id):
+        """(refreshed at in epoch ms, latest values) of a station, read on first use."""
+        with self._lock:
+            entry = self._stations.get(station_id)
+        if entry is None:
+            entry = self.refresh_station(station_id)
+
+        return entry
+
+    def station_ids(self):
+        rows = self.session.execute(self.statements.get('stations'), (self.station_bucket,))
+        with self._lock:
+            station_ids = set(self._stations)
+
+        return station_ids | set(row['id'] for row in rows)
+
+    def refresh(self):
+        """Refresh every known station; failures are logged and leave the previous values in place."""
+        try:
+            station_ids = self.station_ids()
+        except Exception:
+            log.exception("Listing the stations of the latest value index failed")
+            with self._lock:
+                self.failures += 1
+                station_ids = list(self._stations)
+        for station_id in station_ids:
+            try:
+                self.refresh_station(station_id)
+            except Exception:
+                log.exception("Refreshing the latest values of station %s failed", station_id)
+                with self._lock:
+                    self.failures += 1
+
+    def _run(self):
+        while not self._stopped.is_set():
+            started = self.clock()
+            self.refresh()
+            log.debug("Refreshed the latest values of %d stations in %.3f s", len(self._stations),
+                self.clock() - started)
+            self._stopped.wait(self.interval)
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='latest-index')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'stations': len(self._stations),
+                'series': sum(len(values) for refreshed_at, values in self._stations.values()),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'interval': self.interval,
+            }
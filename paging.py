@@ -0,0 +1,77 @@
+"""
+    Cursor based paging over partitioned measurement tables.
+
+    A cursor names the partition a page stopped in and the driver paging
+    state inside that partition, so a client can walk an arbitrarily wide
+    range in bounded pages while the server keeps no state between requests.
+"""
+
+import json
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+
+def encode_partition(partition):
+    if isinstance(partition, date):
+        return partition.isoformat()
+    return partition
+
+def decode_partition(value):
+    if isinstance(value, int):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def encode_cursor(partition, paging_state=None):
+    cursor = {'partition': encode_partition(partition)}
+    if paging_state:
+        cursor['paging_state'] = urlsafe_b64encode(paging_state).decode('ascii')
+
+    return urlsafe_b64encode(json.dumps(cursor).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """(partition key, paging state) of a cursor; ValueError if it is malformed."""
+    try:
+        cursor = json.loads(urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        partition = decode_partition(cursor['partition'])
+        paging_state = cursor.get('paging_state')
+        if paging_state is not None:
+            paging_state = urlsafe_b64decode(paging_state.encode('ascii'))
+    except (TypeError, KeyError, AttributeError, UnicodeError) as e:
+        raise ValueError("Invalid cursor: {}".format(e))
+
+    return partition, paging_state
+
+def fetch_page(session, prepared, key, partitions, bounds, page_size, cursor=None, **execute_kwargs):
+    """Fetch up to ``page_size`` rows of ``prepared`` over ``partitions``.
+
+    The statement is bound to ``key + (partition,) + bounds`` for each
+    partition in turn, starting where ``cursor`` left off. Returns the rows and
+    the cursor of the next page, or None once the last partition is exhausted.
+    Keyword arguments are passed on to ``Session.execute``.
+    """
+    index = 0
+    paging_state = None
+
+    if cursor:
+        partition, paging_state = decode_cursor(cursor)
+        try:
+            index = partitions.index(partition)
+        except ValueError:
+            raise ValueError("Cursor partition {} is outside the requested range".format(partition))
+
+    rows = []
+    while len(rows) < page_size and index < len(partitions):
+        statement = prepared.bind(key + (partitions[index],) + bounds)
+        statement.fetch_size = page_size - len(rows)
+        result = session.execute(statement, paging_state=paging_state, **execute_kwargs)
+        rows.extend(result.current_rows)
+
+        paging_state = result.paging_state
+        if not paging_state:
+            index += 1
+
+    if index >= len(partitions):
+        return rows, None
+
+    return rows, encode_cursor(partitions[index], paging_state)
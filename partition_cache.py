@@ -0,0 +1,84 @@
+"""
+    Result cache for closed partitions.
+
+    Rows are only ever written to the current partition of a measurement
+    table, so once a partition has settled, its last bucket written and the
+    ingestion lag passed (see ``partition_settled_at``), a query over all of
+    it always returns the same rows. ``PartitionCache`` keeps the rows of
+    such queries, keyed by statement, partition key and row factory, and
+    only sends the queries for partitions it does not hold to Cassandra.
+
+    Rows are kept as tuples with the column names stored once per partition;
+    dict rows are rebuilt from them when read.
+"""
+
+from cache import TTLCache
+
+
+def compact(rows):
+    """(column names or None, row tuples) of a list of dict or tuple rows."""
+    if rows and isinstance(rows[0], dict):
+        columns = tuple(rows[0].keys())
+        return columns, [tuple(row.values()) for row in rows]
+    return None, [tuple(row) for row in rows]
+
+def expand(value):
+    columns, rows = value
+    if columns is None:
+        return list(rows)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+class PartitionCache(object):
+
+    def __init__(self, fanout, max_rows=250000):
+        self.fanout = fanout
+        # Sized by rows; every entry also counts one so empty partitions are bounded too.
+        self.cache = TTLCache(max_rows, sizeof=lambda value: len(value[1]) + 1)
+
+    def execute(self, statement, parameters_list, cache_keys, **execute_kwargs):
+        """Like ``FanoutExecutor.execute``, reading and filling the cache.
+
+        ``cache_keys`` holds a key for every parameter tuple whose result can
+        be cached, None for the others.
+        """
+        return self.execute_many(
+            [(statement, parameters) for parameters in parameters_list], cache_keys, **execute_kwargs)
+
+    def execute_many(self, queries, cache_keys, **execute_kwargs):
+        """Like ``FanoutExecutor.execute_many``, reading and filling the cache.
+
+        Result sets of partitions that are not cached are passed on as they
+        are, so that their pages are still fetched as they are consumed.
+        """
+        cached = self.lookup(cache_keys)
+        results = self.fanout.execute_many(
+            [query for query, rows in zip(queries, cached) if rows is None], **execute_kwargs)
+
+        for cache_key, rows in zip(cache_keys, cached):
+            if rows is not None:
+                yield rows
+                continue
+            rows = next(results)
+            if cache_key is not None:
+                rows = list(rows)
+                self.store(cache_key, rows)
+            yield rows
+
+    def lookup(self, cache_keys):
+        """Cached rows for every key of ``cache_keys``, None for keys that are None or not cached."""
+        cached = []
+        for cache_key in cache_keys:
+            value = None if cache_key is None else self.cache.get(cache_key)
+            cached.append(None if value is None else expand(value))
+        return cached
+
+    def store(self, cache_key, rows):
+        if cache_key is not None:
+            self.cache.set(cache_key, compact(rows))
+
+    def clear(self):
+        return self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,115 @@
+"""
+    Partition key planning for time bucketed measurement tables.
+
+    Measurement tables are partitioned by year (``year int``), by the first
+    day of the month (``month_first_day date``), by the Monday of the week
+    (``week_first_day date``) or by day (``date date``), all in UTC. Given the
+    partition column of a table and an inclusive UTC range in epoch
+    milliseconds, ``partition_keys`` returns exactly the partitions that can
+    hold rows in that range.
+"""
+
+from datetime import date, datetime, timedelta
+
+from utils import datetime_to_epoch_ms
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def timestamp_to_datetime(timestamp):
+    """Naive UTC datetime for an epoch millisecond timestamp."""
+    return EPOCH + timedelta(milliseconds=timestamp)
+
+def year_key(dt):
+    return dt.year
+
+def month_key(dt):
+    return date(dt.year, dt.month, 1)
+
+def week_key(dt):
+    day = dt.date()
+    return day - timedelta(days=day.weekday())
+
+def day_key(dt):
+    return dt.date()
+
+def next_year(key):
+    return key + 1
+
+def next_month(key):
+    if key.month == 12:
+        return date(key.year + 1, 1, 1)
+    return date(key.year, key.month + 1, 1)
+
+def next_week(key):
+    return key + timedelta(weeks=1)
+
+def next_day(key):
+    return key + timedelta(days=1)
+
+# partition column -> (key of the bucket holding a UTC datetime, key of the following bucket)
+GRANULARITIES = {
+    'year': (year_key, next_year),
+    'month_first_day': (month_key, next_month),
+    'week_first_day': (week_key, next_week),
+    'date': (day_key, next_day),
+}
+
+
+def partition_key(partition_column, timestamp):
+    """Key of the partition holding ``timestamp`` (epoch ms, UTC)."""
+    key, _ = GRANULARITIES[partition_column]
+    return key(timestamp_to_datetime(timestamp))
+
+def key_start(key):
+    """Naive UTC datetime at which the partition with ``key`` starts."""
+    if isinstance(key, int):
+        return datetime(key, 1, 1)
+    return datetime(key.year, key.month, key.day)
+
+def partition_end(partition_column, timestamp):
+    """Naive UTC datetime at which the partition holding ``timestamp`` ends.
+
+    No rows of later buckets are written to that partition; see
+    ``partition_settled_at`` for when its own rows are complete.
+    """
+    key, following = GRANULARITIES[partition_column]
+    return key_start(following(key(timestamp_to_datetime(timestamp))))
+
+def partition_settled_at(partition_column, timestamp, settle_ms):
+    """Naive UTC datetime after which the partition holding ``timestamp`` no longer changes.
+
+    The rows of a bucket are written after the bucket has ended, and may
+    arrive late, so a partition is only settled ``settle_ms`` after its end.
+    """
+    return partition_end(partition_column, timestamp) + timedelta(milliseconds=settle_ms)
+
+def partition_span(partition_column, key):
+    """``[start, end)`` of the partition with ``key`` in epoch milliseconds."""
+    _, following = GRANULARITIES[partition_column]
+    return datetime_to_epoch_ms(key_start(key)), datetime_to_epoch_ms(key_start(following(key)))
+
+def partition_keys(partition_column, from_timestamp, to_timestamp, descending=False):
+    """Keys of every partition overlapping ``[from_timestamp, to_timestamp]``.
+
+    Keys are returned oldest first, or newest first when ``descending`` is set
+    so that rows of a ``ORDER BY ... DESC`` query stay ordered across
+    partitions. An empty list is returned for an empty range.
+    """
+    key, following = GRANULARITIES[partition_column]
+
+    if from_timestamp > to_timestamp:
+        return []
+
+    last = key(timestamp_to_datetime(to_timestamp))
+    current = key(timestamp_to_datetime(from_timestamp))
+
+    keys = []
+    while current <= last:
+        keys.append(current)
+        current = following(current)
+
+    if descending:
+        keys.reverse()
+
+    return keys
@@ -0,0 +1,107 @@
+"""
+    Resampling to arbitrary intervals.
+
+    A resampled series is computed from the coarsest stored resolution whose
+    row length divides the requested interval, so that every stored row falls
+    in exactly one bucket: a 6h interval is read from the hourly tables and a
+    weekly one from the daily tables. Only the resolutions stored for the
+    series are considered, so a series stored every ten minutes is resampled
+    to days from its ten minute rows. Buckets are aligned to the UTC epoch,
+    and intervals of whole weeks to Mondays.
+
+    Each bucket holds the lowest minimum, the highest maximum and the mean of
+    the averages of its rows, weighted by the number of samples behind each
+    row when the caller has them. The stored tables carry no sample counts,
+    and each of their rows covers the same length of time, so their rows
+    weigh equally and rows without an average are left out.
+"""
+
+import re
+
+import numpy as np
+
+from cassandra.util import Date
+
+from downsampling import float_array, nullable_list
+from frequencies import FREQUENCIES
+from statements import table_resolution
+from utils import datetime_to_epoch_ms
+
+INTERVAL_UNITS = {
+    's': 1,
+    'm': 60,
+    'h': 3600,
+    'd': 86400,
+    'w': 604800,
+}
+INTERVAL_PATTERN = re.compile(r'^(\d+)([smhdw])$')
+
+WEEK_MS = 604800000
+MONDAY_MS = 345600000    # 1970-01-05, the first Monday after the epoch
+
+
+def parse_interval(value):
+    """Seconds of an interval such as ``90s``, ``30m``, ``2h``, ``1d`` or ``1w``."""
+    match = INTERVAL_PATTERN.match(value.strip().lower()) if value else None
+    if match is None:
+        raise ValueError("Invalid interval {!r}".format(value))
+    seconds = int(match.group(1)) * INTERVAL_UNITS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError("Invalid interval {!r}".format(value))
+
+    return seconds
+
+def epoch_ms(value):
+    """Epoch milliseconds of a timestamp or date column value."""
+    if isinstance(value, Date):
+        return value.seconds * 1000
+    return datetime_to_epoch_ms(value)
+
+def select_table(tables, interval, frequencies=None):
+    """The table of ``tables`` with the coarsest resolution dividing ``interval`` seconds, or None.
+
+    With ``frequencies``, the frequencies stored for the series as named in
+    the frequency tables, only the tables of those frequencies are considered
+    so that a series is not read from a table it has no rows in. Without any
+    known frequency every table is considered.
+    """
+    candidates = [table for table in tables if interval % table_resolution(table) == 0]
+    stored = set(FREQUENCIES[frequency] for frequency in frequencies or () if frequency in FREQUENCIES)
+    if stored:
+        candidates = [table for table in candidates if table_resolution(table) in stored]
+    if not candidates:
+        return None
+
+    return max(candidates, key=table_resolution)
+
+def bucket_origin(interval_ms):
+    return MONDAY_MS if interval_ms % WEEK_MS == 0 else 0
+
+def resample(timestamps, min_values, avg_values, max_values, interval_ms, weights=None):
+    """(bucket starts, mins, avgs, maxs, rows) of rows sorted by their epoch millisecond ``timestamps``.
+
+    ``rows`` counts the rows with an average in each bucket; buckets without rows are left out.
+    """
+    if not len(timestamps):
+        return [], [], [], [], []
+
+    origin = bucket_origin(interval_ms)
+    times = np.asarray(timestamps, dtype='int64')
+    starts = (times - origin) // interval_ms * interval_ms + origin
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+
+    averages = float_array(avg_values)
+    present = ~np.isnan(averages)
+    weights = np.ones(len(times)) if weights is None else float_array(weights)
+    weights = np.where(present, np.nan_to_num(weights), 0.0)
+
+    totals = np.add.reduceat(np.where(present, averages, 0.0) * weights, bounds)
+    weight_totals = np.add.reduceat(weights, bounds)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(weight_totals > 0, totals / weight_totals, np.nan)
+
+    lows = np.fmin.reduceat(float_array(min_values), bounds)
+    highs = np.fmax.reduceat(float_array(max_values), bounds)
+    rows = np.add.reduceat(present.astype('int64'), bounds)
+
+    return starts[bounds].tolist(), nullable_list(lows), nullable_list(means), nullable_list(highs), rows.tolist()
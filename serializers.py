@@ -0,0 +1,115 @@
+"""
+    Binary response encodings.
+
+    Measurement and chart responses can be negotiated as MessagePack or as an
+    Arrow IPC stream instead of JSON. Both encoders take columnar data, a
+    mapping of column name to a list of values in which any non-list entry is
+    a scalar that holds for the whole response. Timestamp columns are encoded
+    as int64 epoch milliseconds and floating point columns as float32.
+    msgpack and pyarrow are optional; an encoding whose package is missing is
+    simply not offered.
+"""
+
+import json
+import uuid
+
+from datetime import datetime
+
+from utils import FastEncoder, datetime_to_epoch_ms
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+MIMETYPE_JSON = 'application/json'
+MIMETYPE_MSGPACK = 'application/msgpack'
+MIMETYPE_ARROW = 'application/vnd.apache.arrow.stream'
+
+
+def available_mimetypes():
+    """Response mimetypes that can be produced, JSON first."""
+    mimetypes = [MIMETYPE_JSON]
+    if msgpack is not None:
+        mimetypes.append(MIMETYPE_MSGPACK)
+    if pyarrow is not None:
+        mimetypes.append(MIMETYPE_ARROW)
+
+    return mimetypes
+
+def first_value(values):
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+def epoch_ms_column(values):
+    return [None if value is None else datetime_to_epoch_ms(value) for value in values]
+
+def normalize_columns(data):
+    """Copy of ``data`` with timestamp columns, at any depth, as epoch milliseconds."""
+    normalized = data.__class__()
+    for name, value in data.items():
+        if isinstance(value, dict):
+            value = normalize_columns(value)
+        elif isinstance(value, list) and isinstance(first_value(value), datetime):
+            value = epoch_ms_column(value)
+        elif isinstance(value, datetime):
+            value = datetime_to_epoch_ms(value)
+        normalized[name] = value
+
+    return normalized
+
+def encode_msgpack(data):
+    # use_single_float packs every float as float32.
+    return msgpack.packb(normalize_columns(data), use_bin_type=True, use_single_float=True,
+        default=FastEncoder().default)
+
+def arrow_array(values):
+    sample = first_value(values)
+    if isinstance(sample, datetime):
+        return pyarrow.array(epoch_ms_column(values), type=pyarrow.int64())
+    elif isinstance(sample, float):
+        return pyarrow.array(values, type=pyarrow.float32())
+    elif isinstance(sample, int) and not isinstance(sample, bool):
+        return pyarrow.array(values, type=pyarrow.int64())
+    elif isinstance(sample, uuid.UUID):
+        return pyarrow.array([None if value is None else str(value) for value in values], type=pyarrow.string())
+    elif sample is None or isinstance(sample, (bool, bytes, str)):
+        return pyarrow.array(values)
+
+    encoder = FastEncoder()
+    return pyarrow.array([None if value is None else encoder.encode(value) for value in values],
+        type=pyarrow.string())
+
+def encode_arrow(data):
+    """One record batch of the list columns of ``data`` as an Arrow IPC stream.
+
+    Scalars are stored JSON encoded in the schema metadata.
+    """
+    names = [name for name, value in data.items() if isinstance(value, list)]
+    arrays = [arrow_array(data[name]) for name in names]
+    metadata = dict(
+        (name, json.dumps(value, cls=FastEncoder)) for name, value in data.items() if not isinstance(value, list))
+
+    batch = pyarrow.RecordBatch.from_arrays(arrays, names).replace_schema_metadata(metadata)
+
+    sink = pyarrow.BufferOutputStream()
+    writer = pyarrow.RecordBatchStreamWriter(sink, batch.schema)
+    writer.write_batch(batch)
+    writer.close()
+
+    return sink.getvalue().to_pybytes()
+
+ENCODERS = {
+    MIMETYPE_MSGPACK: encode_msgpack,
+    MIMETYPE_ARROW: encode_arrow,
+}
+
+def encode(data, mimetype):
+    return ENCODERS[mimetype](data)
@@ -16,6 +16,7 @@ setup(
         'Jinja2==2.8',
         'kombu==4.0.2',
         'MarkupSafe==0.23',
+        'numpy',
         'python-dateutil==2.6.0',
         'pytz==2016.10',
         'PyYAML==3.12',
@@ -0,0 +1,126 @@
+"""
+    Response cache shared by the worker processes of a host.
+
+    Under uWSGI the cache lives in a uWSGI cache (see the ``cache2`` option of
+    hydroview-flaskrestapi.ini), which every worker reads and writes and which
+    evicts the least recently used items once its blocks are full. Elsewhere,
+    for instance under gunicorn or the development server, a size bounded
+    in-process ``TTLCache`` takes its place.
+
+    Values are bytes. uWSGI caches can not be scanned, so entries are dropped
+    in groups by folding a generation into their keys: ``bump`` gives a
+    generation a new value and every key built from the old one is never
+    looked up again and ages out.
+"""
+
+import hashlib
+import threading
+import uuid
+
+from cache import TTLCache
+
+try:
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+
+def uwsgi_cache_configured(name):
+    if uwsgi is None:
+        return False
+    options = uwsgi.opt.get('cache2', [])
+    if not isinstance(options, list):
+        options = [options]
+    for option in options:
+        if isinstance(option, bytes):
+            option = option.decode('utf-8')
+        if 'name={},'.format(name) in option + ',':
+            return True
+    return False
+
+
+class UwsgiCache(object):
+
+    def __init__(self, name):
+        self.name = name
+
+    def get(self, key):
+        return uwsgi.cache_get(key, self.name)
+
+    def set(self, key, value, ttl=None):
+        # An expiry of 0 keeps the item until it is evicted.
+        uwsgi.cache_update(key, value, int(ttl or 0), self.name)
+
+    def add(self, key, value):
+        uwsgi.cache_set(key, value, 0, self.name)
+
+
+class LocalCache(TTLCache):
+
+    def __init__(self, max_bytes):
+        super(LocalCache, self).__init__(max_bytes, sizeof=len)
+
+    def add(self, key, value):
+        with self._lock:
+            exists = key in self._entries
+        if not exists:
+            self.set(key, value)
+
+
+class SharedCache(object):
+    """Bytes keyed by tuples of parts, with per worker hit and miss counters."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.backend_name = backend.__class__.__name__
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def _key(parts):
+        return hashlib.sha1('\0'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def get(self, *parts):
+        value = self.backend.get(self._key(parts))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, value, ttl, *parts):
+        self.backend.set(self._key(parts), value, ttl)
+        with self._lock:
+            self.stores += 1
+
+    def generation(self, name):
+        key = self._key(('generation', name))
+        value = self.backend.get(key)
+        if value is None:
+            # Workers racing to start a generation all end up with the first one.
+            value = uuid.uuid4().hex.encode('ascii')
+            self.backend.add(key, value)
+            value = self.backend.get(key) or value
+        return value.decode('ascii')
+
+    def bump(self, name):
+        self.backend.set(self._key(('generation', name)), uuid.uuid4().hex.encode('ascii'))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend_name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores,
+            }
+
+
+def create_shared_cache(name, max_bytes):
+    """SharedCache on the uWSGI cache ``name`` when configured, else on a LocalCache of ``max_bytes``."""
+    if uwsgi_cache_configured(name):
+        return SharedCache(UwsgiCache(name))
+    return SharedCache(LocalCache(max_bytes))
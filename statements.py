@@ -0,0 +1,264 @@
+import logging
+
+from collections import OrderedDict, namedtuple
+from itertools import combinations
+
+log = logging.getLogger(__name__)
+
+ORDERS = ('ASC', 'DESC')
+DATA_SETS = ('min', 'avg', 'max')
+
+MeasurementTable = namedtuple('MeasurementTable', 'name partition_column time_column')
+
+# Seconds aggregated into one row, by table name prefix.
+RESOLUTIONS = OrderedDict([
+    ('daily', 86400),
+    ('hourly', 3600),
+    ('thirty_min', 1800),
+    ('twenty_min', 1200),
+    ('fifteen_min', 900),
+    ('ten_min', 600),
+    ('five_min', 300),
+    ('one_min', 60),
+    ('one_sec', 1),
+])
+
+SINGLE_PARAMETER_TABLES = [
+    MeasurementTable('daily_single_measurements_by_sensor', 'year', 'date'),
+    MeasurementTable('hourly_single_measurements_by_sensor', 'year', 'date_hour'),
+    MeasurementTable('thirty_min_single_measurements_by_sensor', 'year', 'timestamp'),
+    MeasurementTable('twenty_min_single_measurements_by_sensor', 'year', 'timestamp'),
+    MeasurementTable('fifteen_min_single_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('ten_min_single_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('five_min_single_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('one_min_single_measurements_by_sensor', 'week_first_day', 'timestamp'),
+    MeasurementTable('one_sec_single_measurements_by_sensor', 'date', 'timestamp'),
+]
+
+PROFILE_PARAMETER_TABLES = [
+    MeasurementTable('daily_profile_measurements_by_sensor', 'year', 'date'),
+    MeasurementTable('hourly_profile_measurements_by_sensor', 'year', 'date_hour'),
+    MeasurementTable('thirty_min_profile_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('twenty_min_profile_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('fifteen_min_profile_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('ten_min_profile_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('five_min_profile_measurements_by_sensor', 'month_first_day', 'timestamp'),
+    MeasurementTable('one_min_profile_measurements_by_sensor', 'week_first_day', 'timestamp'),
+    MeasurementTable('one_sec_profile_measurements_by_sensor', 'date', 'timestamp'),
+]
+
+GROUP_TABLES = [
+    MeasurementTable('daily_parameter_group_measurements_by_station', 'year', 'date'),
+    MeasurementTable('hourly_parameter_group_measurements_by_station', 'year', 'date_hour'),
+    MeasurementTable('thirty_min_group_measurements_by_station', 'year', 'timestamp'),
+    MeasurementTable('twenty_min_group_measurements_by_station', 'year', 'timestamp'),
+    MeasurementTable('fifteen_min_group_measurements_by_station', 'year', 'timestamp'),
+    MeasurementTable('ten_min_group_measurements_by_station', 'month_first_day', 'timestamp'),
+    MeasurementTable('five_min_group_measurements_by_station', 'month_first_day', 'timestamp'),
+    MeasurementTable('one_min_group_measurements_by_station', 'week_first_day', 'timestamp'),
+    MeasurementTable('one_sec_group_measurements_by_station', 'date', 'timestamp'),
+]
+
+GROUPED_TABLES = [
+    MeasurementTable('daily_group_measurements_by_station_grouped', 'year', 'date'),
+    MeasurementTable('hourly_group_measurements_by_station_grouped', 'year', 'date_hour'),
+    MeasurementTable('thirty_min_group_measurements_by_station_grouped', 'year', 'timestamp'),
+    MeasurementTable('twenty_min_group_measurements_by_station_grouped', 'year', 'timestamp'),
+    MeasurementTable('fifteen_min_group_meas_by_station_grouped', 'year', 'timestamp'),
+    MeasurementTable('ten_min_group_measurements_by_station_grouped', 'year', 'timestamp'),
+    MeasurementTable('five_min_group_measurements_by_station_grouped', 'month_first_day', 'timestamp'),
+    MeasurementTable('one_min_group_measurements_by_station_grouped', 'week_first_day', 'timestamp'),
+    MeasurementTable('one_sec_group_measurements_by_station_grouped', 'date', 'timestamp'),
+]
+
+WEBCAM_PHOTOS_TABLE = MeasurementTable('hourly_webcam_photos_by_station', 'date', 'timestamp')
+
+MEASUREMENT_TABLES = OrderedDict(
+    (table.name, table) for table in
+        SINGLE_PARAMETER_TABLES + PROFILE_PARAMETER_TABLES + GROUP_TABLES + GROUPED_TABLES
+)
+
+METADATA_QUERIES = [
+    ('stations', "SELECT * FROM stations WHERE bucket=?"),
+    ('station_info_by_station', "SELECT * FROM station_info_by_station WHERE id=?"),
+    ('vertical_positions_by_station_parameter',
+        "SELECT * FROM vertical_positions_by_station_parameter WHERE station_id=? AND parameter_id=?"),
+    ('webcam_live_urls_by_station', "SELECT * FROM webcam_live_urls_by_station WHERE station_id=?"),
+    ('sensors_by_station', "SELECT * FROM sensors_by_station WHERE station_id=?"),
+    ('parameters_by_station', "SELECT * FROM parameters_by_station WHERE station_id=?"),
+    ('parameter_groups_by_station', "SELECT * FROM parameter_groups_by_station WHERE station_id=?"),
+    ('parameter_sensors_by_station', "SELECT * FROM parameter_sensors_by_station WHERE station_id=?"),
+    ('parameter_groups_by_sensor', "SELECT * FROM parameter_groups_by_sensor WHERE sensor_id=?"),
+    ('parameters_by_sensor', "SELECT * FROM parameters_by_sensor WHERE sensor_id=?"),
+    ('measurement_frequencies_by_sensor_parameter',
+        """SELECT * FROM measurement_frequencies_by_sensor_parameter WHERE sensor_id=? AND
+            parameter_id=? AND parameter_type=?"""),
+    ('group_measurement_frequencies_by_station',
+        "SELECT * FROM group_measurement_frequencies_by_station WHERE station_id=?"),
+    ('group_measurement_frequencies_by_station_group',
+        "SELECT * FROM group_measurement_frequencies_by_station WHERE station_id=? AND group_id=?"),
+    ('measurement_frequencies_by_station', "SELECT * FROM measurement_frequencies_by_station WHERE station_id=?"),
+    ('group_parameters_by_station', "SELECT * FROM group_parameters_by_station WHERE station_id=?"),
+    ('parameters_by_station_group', "SELECT * FROM parameters_by_station_group WHERE station_id=? AND group_id=?"),
+    ('group_qc_levels_by_station', "SELECT * FROM group_qc_levels_by_station WHERE station_id=?"),
+    ('measurement_frequencies_by_station_parameter',
+        """SELECT * FROM measurement_frequencies_by_station_parameter WHERE station_id=? AND
+            parameter_id=? AND parameter_type=?"""),
+    ('parameter_measurement_frequencies_by_station',
+        "SELECT * FROM parameter_measurement_frequencies_by_station WHERE station_id=?"),
+    ('parameter_qc_levels_by_station', "SELECT * FROM parameter_qc_levels_by_station WHERE station_id=?"),
+]
+
+
+def table_resolution(table):
+    """Seconds aggregated into one row of ``table``."""
+    for prefix, seconds in RESOLUTIONS.items():
+        if table.name.startswith(prefix + '_'):
+            return seconds
+    raise ValueError("Unknown resolution of table {}".format(table.name))
+
+def data_set_variants():
+    """Every non-empty projection of DATA_SETS, in canonical order."""
+    for n in range(1, len(DATA_SETS) + 1):
+        for data_sets in combinations(DATA_SETS, n):
+            yield data_sets
+
+def normalize_data_sets(data_sets):
+    """Map a client ``data_sets`` list onto one of the prepared projections.
+
+    Unknown names are ignored and an empty selection means all value columns.
+    """
+    selected = tuple(name for name in DATA_SETS if name in data_sets)
+    return selected or DATA_SETS
+
+def is_profile_table(table):
+    return table in PROFILE_PARAMETER_TABLES
+
+def sensor_measurements_columns(table, data_sets):
+    """Columns selected by the sensor measurements query of ``table``, in order."""
+    columns = ["sensor_id", "parameter_id", "qc_level", table.partition_column, table.time_column]
+    if is_profile_table(table):
+        columns.append("vertical_position")
+    columns.append("unit")
+    columns.extend("{}_value".format(name) for name in data_sets)
+
+    return columns
+
+def sensor_measurements_query(table, data_sets, order):
+    columns = sensor_measurements_columns(table, data_sets)
+
+    return """
+        SELECT {columns} FROM {table} WHERE sensor_id=? AND
+            parameter_id=? AND qc_level=? AND {partition}=? AND {time}>=? AND
+                {time}<=? ORDER BY {time} {order}""".format(
+                    columns=", ".join(columns), table=table.name, partition=table.partition_column,
+                    time=table.time_column, order=order)
+
+def sensor_latest_query(table):
+    """Newest row of a sensor series in one partition; the tables are clustered newest first."""
+    return """
+        SELECT {columns} FROM {table} WHERE sensor_id=? AND
+            parameter_id=? AND qc_level=? AND {partition}=? LIMIT 1""".format(
+                columns=", ".join(sensor_measurements_columns(table, DATA_SETS)), table=table.name,
+                partition=table.partition_column)
+
+def group_measurements_query(table, order=None):
+    query = """
+        SELECT * FROM {table} WHERE station_id=? AND group_id=? AND qc_level=? AND
+            {partition}=? AND {time}>=? AND {time}<=?""".format(
+                table=table.name, partition=table.partition_column, time=table.time_column)
+    if order:
+        query += " ORDER BY {time} {order}".format(time=table.time_column, order=order)
+
+    return query
+
+
+class StatementRegistry(object):
+    """Every CQL statement the API issues, prepared once per Cassandra session.
+
+    Statements are registered by name, optionally qualified by a variant such
+    as the column projection or the clustering order, and looked up with the
+    same name and variant keywords on the request path.
+    """
+
+    def __init__(self):
+        self.queries = OrderedDict()
+        self.prepared = {}
+        self.failures = {}
+
+    @staticmethod
+    def _key(name, variant):
+        return (name, tuple(sorted(variant.items())))
+
+    def add(self, name, query, **variant):
+        self.queries[self._key(name, variant)] = query
+
+    def prepare_all(self, session):
+        self.prepared.clear()
+        self.failures.clear()
+
+        for key, query in self.queries.items():
+            try:
+                self.prepared[key] = session.prepare(query)
+            except Exception as e:
+                self.failures[key] = e
+                log.error("Failed to prepare statement {name} {variant}: {error}".format(
+                    name=key[0], variant=dict(key[1]), error=e))
+
+        log.info("Prepared {prepared} statements ({failed} failed)".format(
+            prepared=len(self.prepared), failed=len(self.failures)))
+
+        return not self.failures
+
+    def get(self, name, **variant):
+        key = self._key(name, variant)
+        try:
+            return self.prepared[key]
+        except KeyError:
+            if key in self.failures:
+                raise KeyError("Statement {name} {variant} failed to prepare: {error}".format(
+                    name=name, variant=variant, error=self.failures[key]))
+            raise KeyError("Unknown statement {name} {variant}".format(name=name, variant=variant))
+
+
+def build_registry():
+    registry = StatementRegistry()
+
+    for name, query in METADATA_QUERIES:
+        registry.add(name, query)
+
+    for order in ORDERS:
+        query = """
+            SELECT * FROM video_urls_by_station WHERE station_id=? AND added_date>=? AND
+                added_date<=? ORDER BY added_date {order}""".format(order=order)
+        registry.add('video_urls_by_station', query, order=order, limit=False)
+        registry.add('video_urls_by_station', query + " LIMIT ?", order=order, limit=True)
+
+        for ranged in (False, True):
+            query = "SELECT * FROM hourly_webcam_photos_by_station WHERE station_id=? AND date=? "
+            if ranged:
+                query += "AND timestamp >=? AND timestamp <=? "
+            query += "ORDER BY timestamp {order}".format(order=order)
+            registry.add('hourly_webcam_photos_by_station', query, order=order, ranged=ranged, limit=False)
+            registry.add('hourly_webcam_photos_by_station', query + " LIMIT ?", order=order, ranged=ranged, limit=True)
+
+    registry.add('hourly_webcam_photo_by_station',
+        "SELECT photo FROM hourly_webcam_photos_by_station WHERE station_id=? AND date=? AND timestamp=?")
+
+    for table in SINGLE_PARAMETER_TABLES + PROFILE_PARAMETER_TABLES:
+        for data_sets in data_set_variants():
+            for order in ORDERS:
+                registry.add(table.name, sensor_measurements_query(table, data_sets, order),
+                    data_sets=data_sets, order=order)
+
+    for table in SINGLE_PARAMETER_TABLES:
+        registry.add(table.name, sensor_latest_query(table), latest=True)
+
+    for table in GROUP_TABLES:
+        for order in (None, 'ASC'):
+            registry.add(table.name, group_measurements_query(table, order), order=order)
+
+    for table in GROUPED_TABLES:
+        registry.add(table.name, group_measurements_query(table), order=None)
+
+    return registry
@@ -0,0 +1,192 @@
+"""
+    Live measurement streams.
+
+    Browsers follow a station group through Server-Sent Events instead of
+    polling. Every (station, group, QC level, table) being followed has one
+    ``Poller`` per worker process, which reads the rows stored since its
+    previous read from the newest partitions of the table once per interval
+    and fans them out to every subscription. Cassandra is therefore queried once
+    per interval and stream however many clients are subscribed. Each read
+    overlaps the previous one by the ingestion lag, and rows already sent are
+    recognised by their timestamp and parameter, so rows written late are
+    still sent, once.
+
+    Messages are encoded once per poll and shared by all subscriptions. A
+    subscription whose client falls so far behind that its queue fills up is
+    closed instead of holding back the others.
+
+    A stream holds the request worker serving it for as long as its client
+    stays connected, so a hub may be limited to ``max_subscriptions`` open at
+    once; see ``stream_limit`` in app/__init__.py.
+"""
+
+import json
+import logging
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from partitions import partition_keys
+from resampling import epoch_ms
+from utils import FastEncoder
+
+log = logging.getLogger(__name__)
+
+
+class Subscription(object):
+
+    def __init__(self, poller, max_size):
+        self.poller = poller
+        self.messages = queue.Queue(max_size)
+        self.closed = False
+
+    def publish(self, message):
+        try:
+            self.messages.put_nowait(message)
+        except queue.Full:
+            self.close()
+
+    def close(self):
+        self.closed = True
+        # Wake a waiting reader; the queue may be full, which is fine.
+        try:
+            self.messages.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def get(self, timeout=None):
+        """The next message, or None when ``timeout`` seconds passed without one or when closed."""
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class Poller(object):
+
+    def __init__(self, hub, key, table, statement):
+        self.hub = hub
+        self.key = key
+        self.table = table
+        self.statement = statement
+        self.subscriptions = set()
+        self.started_at = int(hub.clock() * 1000)
+        self.read_to = self.started_at
+        self.last_timestamp = self.started_at
+        self.published = {}    # (timestamp, parameter_id) of the published rows still in the window -> timestamp
+        self._stopped = threading.Event()
+        self._thread = None
+        self.polls = 0
+
+    def row_key(self, row):
+        return epoch_ms(row[self.table.time_column]), row.get('parameter_id')
+
+    def poll_once(self):
+        """Publish the rows not published before; returns how many there were.
+
+        Every poll reads again the ``lag`` seconds of the hub before the end of
+        the previous one, so that rows written late, or of another parameter
+        at an already published timestamp, are still sent once.
+        """
+        now = int(self.hub.clock() * 1000)
+        from_timestamp = max(self.started_at + 1, self.read_to - self.hub.lag * 1000)
+        rows = []
+        for partition in partition_keys(self.table.partition_column, from_timestamp, now):
+            rows.extend(self.hub.session.execute(self.statement, self.key + (partition, from_timestamp, now)))
+        self.polls += 1
+        self.read_to = now
+
+        self.published = dict(
+            (key, timestamp) for key, timestamp in self.published.items() if timestamp >= from_timestamp)
+        new_rows = []
+        for row in rows:
+            key = self.row_key(row)
+            if key not in self.published:
+                self.published[key] = key[0]
+                new_rows.append(row)
+        if not new_rows:
+            return 0
+
+        self.last_timestamp = max(self.last_timestamp, max(self.row_key(row)[0] for row in new_rows))
+        message = (self.last_timestamp, json.dumps(new_rows, cls=FastEncoder))
+        for subscription in self.hub.subscriptions(self):
+            subscription.publish(message)
+
+        return len(new_rows)
+
+    def _run(self):
+        while not self._stopped.wait(self.hub.interval):
+            try:
+                self.poll_once()
+            except Exception:
+                log.exception("Polling %s %s failed", self.table.name, self.key)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stream-poller')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+
+class StreamHub(object):
+    """Pollers by (key, table), started with their first subscription and stopped with their last."""
+
+    def __init__(self, session, interval=10, queue_size=100, clock=time.time, threaded=True, max_subscriptions=None,
+            lag=0):
+        self.session = session
+        self.interval = interval
+        self.lag = lag
+        self.queue_size = queue_size
+        self.clock = clock
+        self.threaded = threaded
+        self.max_subscriptions = max_subscriptions
+        self.pollers = {}
+        self._lock = threading.Lock()
+        self.refused = 0
+
+    def _subscription_count(self):
+        return sum(len(poller.subscriptions) for poller in self.pollers.values())
+
+    def subscribe(self, key, table, statement):
+        """A new subscription to the poller of ``key``, or None when ``max_subscriptions`` are open already."""
+        with self._lock:
+            if self.max_subscriptions is not None and self._subscription_count() >= self.max_subscriptions:
+                self.refused += 1
+                return None
+            poller = self.pollers.get((key, table.name))
+            if poller is None:
+                poller = self.pollers[(key, table.name)] = Poller(self, key, table, statement)
+                if self.threaded:
+                    poller.start()
+            subscription = Subscription(poller, self.queue_size)
+            poller.subscriptions.add(subscription)
+
+        return subscription
+
+    def subscriptions(self, poller):
+        """Copy of the subscriptions of ``poller``, safe to iterate while clients come and go."""
+        with self._lock:
+            return list(poller.subscriptions)
+
+    def unsubscribe(self, subscription):
+        poller = subscription.poller
+        with self._lock:
+            poller.subscriptions.discard(subscription)
+            if not poller.subscriptions and self.pollers.get((poller.key, poller.table.name)) is poller:
+                del self.pollers[(poller.key, poller.table.name)]
+                poller.stop()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pollers': len(self.pollers),
+                'subscriptions': self._subscription_count(),
+                'max_subscriptions': self.max_subscriptions,
+                'refused': self.refused,
+            }
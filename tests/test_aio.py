@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import unittest
+
+from aio import AsyncFanout, wrap_future
+
+
+class FakeResponseFuture(object):
+    """Delivers its pages from a driver thread, like ``cassandra.cluster.ResponseFuture``."""
+
+    def __init__(self, pages, error=None):
+        self.pages = list(pages)
+        self.error = error
+        self.has_more_pages = False
+        self.callback = None
+        self.errback = None
+
+    def add_callbacks(self, callback, errback):
+        self.callback = callback
+        self.errback = errback
+        self.start_fetching_next_page()
+
+    def start_fetching_next_page(self):
+        threading.Thread(target=self._deliver).start()
+
+    def _deliver(self):
+        if self.error is not None and len(self.pages) <= 1:
+            self.errback(self.error)
+            return
+        page = self.pages.pop(0)
+        self.has_more_pages = bool(self.pages)
+        self.callback(page)
+
+
+class FakeSession(object):
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.executed = []
+
+    def execute_async(self, statement, parameters, **kwargs):
+        self.executed.append((statement, parameters))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        future = FakeResponseFuture([[(statement, parameters)]])
+        callback = future._deliver
+
+        def deliver():
+            self.in_flight -= 1
+            callback()
+        future._deliver = deliver
+
+        return future
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class WrapFutureTests(unittest.TestCase):
+
+    def test_rows_of_every_page(self):
+        async def rows():
+            return await wrap_future(FakeResponseFuture([[1, 2], [3], [4]]))
+
+        self.assertEqual(run(rows()), [1, 2, 3, 4])
+
+    def test_error_raised_on_the_loop(self):
+        async def rows():
+            return await wrap_future(FakeResponseFuture([[1], [2]], error=ValueError('timeout')))
+
+        with self.assertRaises(ValueError):
+            run(rows())
+
+
+class AsyncFanoutTests(unittest.TestCase):
+
+    def test_results_in_query_order(self):
+        session = FakeSession()
+        fanout = AsyncFanout(session, max_per_request=2, max_per_process=4)
+        queries = [('statement', (index,)) for index in range(7)]
+
+        results = run(fanout.execute_many(queries))
+
+        self.assertEqual(results, [[query] for query in queries])
+        self.assertLessEqual(session.max_in_flight, 2)
+        self.assertEqual(fanout.stats()['completed'], 7)
+        self.assertEqual(fanout.stats()['in_flight'], 0)
+
+    def test_failures_counted(self):
+        class FailingSession(FakeSession):
+            def execute_async(self, statement, parameters, **kwargs):
+                return FakeResponseFuture([[]], error=RuntimeError('unavailable'))
+
+        fanout = AsyncFanout(FailingSession())
+        with self.assertRaises(RuntimeError):
+            run(fanout.execute_many([('statement', ())]))
+        self.assertEqual(fanout.stats()['failed'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+
+from cache import TTLCache
+from partition_cache import PartitionCache
+from shared_cache import LocalCache, SharedCache
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFanout(object):
+
+    def __init__(self):
+        self.executed = []
+
+    def execute_many(self, queries):
+        for statement, parameters in queries:
+            self.executed.append(parameters)
+            yield iter([{'partition': parameters[0], 'value': 1.5}])
+
+
+class TTLCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_size=2, clock=self.clock)
+
+    def test_hits_and_misses(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', [], ttl=10)
+
+        self.assertEqual(self.cache.get('a'), [])
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_entries_expire(self):
+        self.cache.set('a', 1, ttl=10)
+        self.cache.set('b', 2, ttl=20)
+        self.clock.now = 10
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), 2)
+        self.assertEqual(self.cache.stats()['expirations'], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set('a', 1, ttl=10)
+        self.cache.set('b', 2, ttl=10)
+        self.cache.get('a')
+        self.cache.set('c', 3, ttl=10)
+
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_invalidate_by_tag(self):
+        cache = TTLCache(max_size=10, clock=self.clock)
+        cache.set(('sensors', 1), 'x', ttl=10, tag=1)
+        cache.set(('sensors', 2), 'y', ttl=10, tag=2)
+        cache.set(('stations', 0), 'z', ttl=10)
+
+        self.assertEqual(cache.invalidate((1, None)), 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(('sensors', 2)), 'y')
+        self.assertEqual(cache.clear(), 1)
+        self.assertEqual(cache.stats()['invalidations'], 3)
+
+    def test_bounded_by_size_of_values(self):
+        cache = TTLCache(max_size=9, clock=self.clock, sizeof=len)
+        cache.set('a', b'12345')
+        cache.set('b', b'1234')
+        cache.set('a', b'123')
+        cache.set('c', b'123')
+        cache.set('huge', b'1234567890')
+
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), b'123')
+        self.assertEqual(cache.get('huge'), None)
+        self.assertEqual(cache.size, 6)
+
+
+class SharedCacheTests(unittest.TestCase):
+
+    def test_generations(self):
+        cache = SharedCache(LocalCache(1024))
+        generation = cache.generation('station')
+        cache.set(b'body', 60, 'metadata', generation)
+
+        self.assertEqual(cache.generation('station'), generation)
+        self.assertEqual(cache.get('metadata', generation), b'body')
+
+        cache.bump('station')
+
+        self.assertNotEqual(cache.generation('station'), generation)
+        self.assertIsNone(cache.get('metadata', cache.generation('station')))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+class PartitionCacheTests(unittest.TestCase):
+
+    def test_only_uncached_partitions_are_queried(self):
+        fanout = FakeFanout()
+        cache = PartitionCache(fanout)
+        parameters_list = [(2015, ), (2016, ), (2017, )]
+        cache_keys = [('q', 2015), ('q', 2016), None]
+
+        first = [list(rows) for rows in cache.execute('q', parameters_list, cache_keys)]
+        second = list(cache.execute('q', parameters_list, cache_keys))
+
+        # The current partition is not cached and is passed on without being read.
+        self.assertNotIsInstance(second[2], list)
+        self.assertEqual(first, second[:2] + [list(second[2])])
+        self.assertEqual(second[1], [{'partition': 2016, 'value': 1.5}])
+        self.assertEqual(fanout.executed, [(2015, ), (2016, ), (2017, ), (2017, )])
+        self.assertEqual(cache.stats()['hits'], 2)
@@ -0,0 +1,52 @@
+import math
+import unittest
+
+from datetime import datetime, timedelta
+
+from downsampling import bucket_bounds, downsample_chart
+
+
+def series(count):
+    start = datetime(2017, 1, 1)
+    timestamps = [start + timedelta(seconds=i) for i in range(count)]
+    avg_values = [math.sin(i / 10.0) for i in range(count)]
+    return timestamps, avg_values, [value - 1 for value in avg_values], [value + 1 for value in avg_values]
+
+
+class DownsampleChartTests(unittest.TestCase):
+
+    def test_bucket_bounds(self):
+        self.assertEqual(bucket_bounds(10, 4).tolist(), [0, 1, 5, 9, 10])
+
+    def test_short_series_are_unchanged(self):
+        data = series(5)
+
+        self.assertEqual(downsample_chart(*data, max_points=5), data)
+
+    def test_reduces_to_max_points_keeping_ends_and_envelope(self):
+        timestamps, avg_values, min_values, max_values = series(1000)
+
+        result = downsample_chart(timestamps, avg_values, min_values, max_values, max_points=50)
+
+        for values in result:
+            self.assertEqual(len(values), 50)
+        self.assertEqual(result[0][0], timestamps[0])
+        self.assertEqual(result[0][-1], timestamps[-1])
+        self.assertEqual(result[0], sorted(result[0]))
+        self.assertAlmostEqual(min(result[2]), min(min_values))
+        self.assertAlmostEqual(max(result[3]), max(max_values))
+        for timestamp, avg_value in zip(result[0], result[1]):
+            self.assertEqual(avg_values[timestamps.index(timestamp)], avg_value)
+
+    def test_missing_values(self):
+        timestamps, avg_values, min_values, max_values = series(100)
+        avg_values[10:40] = [None] * 30
+        min_values[10:40] = [None] * 30
+
+        result = downsample_chart(timestamps, avg_values, min_values, max_values, max_points=10)
+
+        # The third bucket, points 13 to 24, has no averages and no minimums.
+        self.assertIsNone(result[1][2])
+        self.assertIsNone(result[2][2])
+        self.assertIsNotNone(result[3][2])
+        self.assertEqual(len(result[1]), 10)
@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+import unittest
+
+from fanout import FanoutExecutor
+
+
+class DelayedFuture(object):
+
+    def __init__(self, session, rows, error=None):
+        self.session = session
+        self.rows = rows
+        self.error = error
+
+    def add_callbacks(self, callback, errback, callback_args=(), errback_args=()):
+        def complete():
+            with self.session.lock:
+                self.session.in_flight -= 1
+            if self.error is None:
+                callback(self.rows, *callback_args)
+            else:
+                errback(self.error, *errback_args)
+        threading.Timer(random.uniform(0, 0.01), complete).start()
+
+    def result(self):
+        return self.rows
+
+
+class PagedFuture(DelayedFuture):
+    """Runs the callbacks once per page, as the driver does while a result set is iterated."""
+
+    pages = 3
+
+    def add_callbacks(self, callback, errback, callback_args=(), errback_args=()):
+        def complete():
+            with self.session.lock:
+                self.session.in_flight -= 1
+            for page in range(self.pages):
+                callback(self.rows, *callback_args)
+        threading.Timer(random.uniform(0, 0.01), complete).start()
+
+
+class FakeSession(object):
+
+    def __init__(self, failing=(), future_class=DelayedFuture):
+        self.failing = failing
+        self.future_class = future_class
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.statements = []
+
+    def execute_async(self, statement, parameters):
+        with self.lock:
+            self.statements.append(statement)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        error = ValueError(parameters) if parameters in self.failing else None
+        return self.future_class(self, [parameters], error)
+
+
+class FanoutExecutorTests(unittest.TestCase):
+
+    def test_results_in_partition_order(self):
+        executor = FanoutExecutor(FakeSession(), max_per_request=4)
+        parameters = [(i,) for i in range(50)]
+
+        self.assertEqual([rows[0] for rows in executor.execute('query', parameters)], parameters)
+        self.assertEqual(executor.stats()['completed'], 50)
+
+    def test_mixed_statements_in_order(self):
+        session = FakeSession()
+        executor = FanoutExecutor(session, max_per_request=4)
+        queries = [('query {}'.format(i % 3), (i,)) for i in range(20)]
+
+        self.assertEqual([rows[0] for rows in executor.execute_many(queries)], [query[1] for query in queries])
+        self.assertEqual(sorted(session.statements), sorted(query[0] for query in queries))
+
+    def test_per_request_limit(self):
+        session = FakeSession()
+        executor = FanoutExecutor(session, max_per_request=3)
+
+        list(executor.execute('query', [(i,) for i in range(30)]))
+        self.assertLessEqual(session.max_in_flight, 3)
+
+    def test_per_process_limit(self):
+        session = FakeSession()
+        executor = FanoutExecutor(session, max_per_request=4, max_per_process=6)
+        threads = [threading.Thread(target=lambda: list(executor.execute('query', [(i,) for i in range(20)])))
+            for _ in range(5)]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(session.max_in_flight, 6)
+        stats = executor.stats()
+        self.assertEqual((stats['queued'], stats['in_flight'], stats['completed']), (0, 0, 100))
+
+    def test_error_is_raised_and_counters_settle(self):
+        executor = FanoutExecutor(FakeSession(failing=[(3,)]), max_per_request=2)
+
+        with self.assertRaises(ValueError):
+            list(executor.execute('query', [(i,) for i in range(10)]))
+
+        time.sleep(0.05)
+        stats = executor.stats()
+        self.assertEqual((stats['queued'], stats['in_flight'], stats['failed']), (0, 0, 1))
+
+    def test_paged_results_release_their_slot_once(self):
+        session = FakeSession(future_class=PagedFuture)
+        executor = FanoutExecutor(session, max_per_request=4, max_per_process=4)
+        results = []
+        run = lambda: results.append(list(executor.execute('query', [(i,) for i in range(20)])))
+        threads = [threading.Thread(target=run) for _ in range(3)]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(results), 3)
+        time.sleep(0.05)
+        stats = executor.stats()
+        self.assertEqual((stats['queued'], stats['in_flight'], stats['completed']), (0, 0, 60))
+        # Every slot is free again, and none was released twice.
+        self.assertTrue(all(executor._slots.acquire(False) for _ in range(4)))
+        self.assertFalse(executor._slots.acquire(False))
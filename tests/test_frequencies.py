@@ -0,0 +1,69 @@
+import unittest
+
+from frequencies import estimate, select_density, select_frequency
+from statements import GROUPED_TABLES, MEASUREMENT_TABLES
+
+HOUR_MS = 3600000
+DAY_MS = 24 * HOUR_MS
+JAN_2017 = 1483228800000
+ALL = ['1 Sec', '1 Min', '5 Min', '10 Min', '15 Min', '20 Min', '30 Min', 'Hourly', 'Daily']
+
+
+class EstimateTests(unittest.TestCase):
+
+    def test_rows_and_partitions(self):
+        table = MEASUREMENT_TABLES['one_sec_group_measurements_by_station_grouped']
+        item = estimate('1 Sec', table, JAN_2017, JAN_2017 + DAY_MS + 59999)
+
+        self.assertEqual(item.rows, 86460)
+        self.assertEqual(item.partitions, 2)
+
+    def test_empty_range(self):
+        table = MEASUREMENT_TABLES['daily_group_measurements_by_station_grouped']
+        self.assertEqual(estimate('Daily', table, 1, 0)[2:], (0, 0))
+
+
+class SelectFrequencyTests(unittest.TestCase):
+
+    def select(self, frequencies, span, max_points=300, max_partitions=64):
+        selected = select_frequency(frequencies, GROUPED_TABLES, JAN_2017, JAN_2017 + span, max_points, max_partitions)
+        return selected and selected.frequency
+
+    def test_finest_within_point_budget(self):
+        self.assertEqual(self.select(ALL, 4 * 60 * 1000), '1 Sec')
+        self.assertEqual(self.select(ALL, 4 * HOUR_MS), '1 Min')
+        self.assertEqual(self.select(ALL, 20 * HOUR_MS), '5 Min')
+        self.assertEqual(self.select(ALL, 10 * DAY_MS), 'Hourly')
+        self.assertEqual(self.select(ALL, 200 * DAY_MS), 'Daily')
+
+    def test_only_available_frequencies(self):
+        self.assertEqual(self.select(['Hourly', '10 Min'], 4 * HOUR_MS), '10 Min')
+        self.assertEqual(self.select(['Unknown', 'Daily'], HOUR_MS), 'Daily')
+        self.assertIsNone(self.select([], HOUR_MS))
+
+    def test_partition_budget(self):
+        self.assertEqual(self.select(ALL, 2 * DAY_MS - 1, max_points=10 ** 6, max_partitions=2), '1 Sec')
+        self.assertEqual(self.select(ALL, 3 * DAY_MS, max_points=10 ** 6, max_partitions=2), '1 Min')
+
+    def test_coarsest_when_over_budget(self):
+        self.assertEqual(self.select(['1 Min', '5 Min'], 30 * DAY_MS), '5 Min')
+
+
+class SelectDensityTests(unittest.TestCase):
+
+    def select(self, frequencies, span, min_points):
+        selected = select_density(frequencies, GROUPED_TABLES, JAN_2017, JAN_2017 + span, min_points)
+        return selected and selected.frequency
+
+    def test_coarsest_meeting_density(self):
+        self.assertEqual(self.select(ALL, 30 * DAY_MS, 500), 'Hourly')
+        self.assertEqual(self.select(ALL, 30 * DAY_MS, 30), 'Daily')
+        self.assertEqual(self.select(['1 Sec', '10 Min'], 30 * DAY_MS, 500), '10 Min')
+
+    def test_finest_when_density_not_met(self):
+        self.assertEqual(self.select(['1 Min', 'Hourly'], HOUR_MS, 500), '1 Min')
+        self.assertIsNone(self.select(['Unknown'], HOUR_MS, 500))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,9 @@ import json
 import os
 import tempfile
 import unittest
+import uuid
 
+from datetime import datetime
 from operator import getitem
 
 from cassandra.cluster import Cluster, Session
@@ -105,3 +107,33 @@ class HydroViewFlaskTests(unittest.TestCase):
         session.execute(
             "DELETE FROM stations_by_location WHERE location_id=%s AND station_name=%s and station_id=%s", ('test_location', 'Test Station', 'test_station')
         )
+    
+    def test_resample_group(self):
+        station_id = uuid.uuid4()
+        group_id = uuid.uuid4()
+        parameter_id = uuid.uuid4()
+        
+        for hour, value in ((0, 1.0), (1, 3.0), (2, 5.0)):
+            session.execute(
+                """INSERT INTO hourly_parameter_group_measurements_by_station (station_id, group_id, qc_level, year, date_hour, parameter_id, avg_value, min_value, max_value, unit)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""", (
+                        station_id, group_id, 0, 2017, datetime(2017, 1, 1, hour), parameter_id, value, value - 1, value + 1, 'm'
+                )
+            )
+        
+        response = self.app.get(
+            '/api/resample?station_id={}&group_id={}&qc_level=0&interval=2h&from_timestamp=1483228800000&to_timestamp=1483239599999'.format(
+                station_id, group_id))
+        self.assertEqual(response.status_code, 200)
+        
+        response_data_decoded = json.loads(response.data.decode('utf-8'))
+        series = response_data_decoded['parameters'][str(parameter_id)]
+        self.assertEqual(response_data_decoded['source'], 'hourly_parameter_group_measurements_by_station')
+        self.assertEqual(series['timestamp'], [1483228800000, 1483236000000])
+        self.assertEqual(series['avg_value'], [2.0, 5.0])
+        self.assertEqual(series['min_value'], [0.0, 4.0])
+        self.assertEqual(series['max_value'], [4.0, 6.0])
+        
+        session.execute(
+            "DELETE FROM hourly_parameter_group_measurements_by_station WHERE station_id=%s AND group_id=%s AND qc_level=%s AND year=%s", (station_id, group_id, 0, 2017)
+        )
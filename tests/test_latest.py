@@ -0,0 +1,112 @@
+import unittest
+import uuid
+
+from datetime import datetime
+
+from latest import LatestIndex, finest_table, previous_partition
+from partitions import partition_key
+
+STATION = uuid.UUID(int=1)
+SENSOR = uuid.UUID(int=2)
+PARAMETERS = [uuid.UUID(int=3), uuid.UUID(int=4)]
+NOW = 1485000000    # 2017-01-21 12:00:00 UTC
+
+
+class FakeSession(object):
+
+    def __init__(self, frequencies):
+        self.frequencies = frequencies
+        self.executed = []
+
+    def execute(self, statement, parameters):
+        self.executed.append(statement)
+        if statement == 'measurement_frequencies_by_station':
+            return [
+                {'sensor_id': SENSOR, 'parameter_id': parameter_id, 'parameter_type': parameter_type,
+                    'measurement_frequencies': frequencies}
+                for parameter_id, parameter_type, frequencies in self.frequencies]
+        return [{'id': STATION}]
+
+
+class FakeStatements(object):
+
+    def get(self, name, **variant):
+        return name
+
+
+class FakeFanout(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute_many(self, queries):
+        for statement, parameters in queries:
+            self.executed.append((statement, parameters))
+            yield self.rows.get((parameters[1], parameters[3]), [])
+
+
+def measurement(timestamp, value):
+    return {'timestamp': timestamp, 'unit': 'm', 'avg_value': value, 'min_value': value, 'max_value': value}
+
+
+class FinestTableTests(unittest.TestCase):
+
+    def test_finest_known_frequency(self):
+        frequency, table = finest_table(['Hourly', '10 Min', 'Unknown'])
+        self.assertEqual((frequency, table.name), ('10 Min', 'ten_min_single_measurements_by_sensor'))
+        self.assertIsNone(finest_table(['Unknown']))
+        self.assertIsNone(finest_table(None))
+
+    def test_previous_partition(self):
+        january = partition_key('month_first_day', NOW * 1000)
+        self.assertEqual(previous_partition('month_first_day', january), partition_key('month_first_day', 1480550400000))
+
+
+class LatestIndexTests(unittest.TestCase):
+
+    def index(self, rows):
+        session = FakeSession([
+            (PARAMETERS[0], 'single', ['5 Min', 'Hourly']),
+            (PARAMETERS[1], 'single', ['5 Min']),
+            (uuid.UUID(int=5), 'profile', ['5 Min']),
+        ])
+        fanout = FakeFanout(rows)
+        index = LatestIndex(session, fanout, FakeStatements(), clock=lambda: NOW)
+        return index, session, fanout
+
+    def test_newest_partition_then_the_one_before(self):
+        january = partition_key('month_first_day', NOW * 1000)
+        december = previous_partition('month_first_day', january)
+        index, session, fanout = self.index({
+            (PARAMETERS[0], january): [measurement(datetime(2017, 1, 21, 11, 55), 1.5)],
+            (PARAMETERS[1], december): [measurement(datetime(2016, 12, 31, 23, 55), 2.5)],
+        })
+
+        refreshed_at, values = index.get(STATION)
+
+        self.assertEqual(refreshed_at, NOW * 1000)
+        self.assertEqual([value['avg_value'] for value in values], [1.5, 2.5])
+        self.assertEqual(values[0]['timestamp'], 1484999700000)
+        self.assertEqual(values[0]['frequency'], '5 Min')
+        self.assertEqual(len(fanout.executed), 3)
+
+    def test_served_from_memory_until_refreshed(self):
+        january = partition_key('month_first_day', NOW * 1000)
+        rows = {(PARAMETERS[0], january): [measurement(datetime(2017, 1, 21, 11, 55), 1.5)]}
+        index, session, fanout = self.index(rows)
+
+        index.get(STATION)
+        executed = len(fanout.executed)
+        index.get(STATION)
+        self.assertEqual(len(fanout.executed), executed)
+
+        # A series without new rows keeps its last value.
+        rows.clear()
+        index.refresh()
+        self.assertEqual([value['avg_value'] for value in index.get(STATION)[1]], [1.5])
+        self.assertEqual(index.stats()['refreshes'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
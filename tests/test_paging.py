@@ -0,0 +1,81 @@
+import unittest
+
+from datetime import date
+
+from paging import decode_cursor, encode_cursor, fetch_page
+
+
+class BoundStatement(object):
+
+    def __init__(self, values):
+        self.values = values
+        self.fetch_size = None
+
+
+class PreparedStatement(object):
+
+    def bind(self, values):
+        return BoundStatement(values)
+
+
+class PagedResult(object):
+
+    def __init__(self, current_rows, paging_state):
+        self.current_rows = current_rows
+        self.paging_state = paging_state
+
+
+class FakeSession(object):
+    """Serves the rows of each partition in fetch_size pages, using the row offset as paging state."""
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+
+    def execute(self, statement, paging_state=None, **kwargs):
+        rows = self.partitions[statement.values[1]]
+        start = int(paging_state or 0)
+        end = start + statement.fetch_size
+        next_state = str(end).encode('ascii') if end < len(rows) else None
+        return PagedResult(rows[start:end], next_state)
+
+
+class PagingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.partitions = [date(2017, 1, 1), date(2017, 1, 2), date(2017, 1, 3)]
+        self.session = FakeSession({
+            date(2017, 1, 1): list(range(0, 5)),
+            date(2017, 1, 2): [],
+            date(2017, 1, 3): list(range(5, 12)),
+        })
+
+    def fetch_all(self, page_size):
+        pages = []
+        cursor = None
+        while True:
+            rows, cursor = fetch_page(self.session, PreparedStatement(), ('sensor',), self.partitions, (0, 1),
+                page_size, cursor)
+            pages.append(rows)
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_all_partitions_in_order(self):
+        pages = self.fetch_all(4)
+
+        self.assertEqual([row for page in pages for row in page], list(range(12)))
+        self.assertTrue(all(len(page) <= 4 for page in pages))
+
+    def test_single_page(self):
+        self.assertEqual(self.fetch_all(100), [list(range(12))])
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor(date(2017, 1, 3), b'\x00\x01state')
+        self.assertEqual(decode_cursor(cursor), (date(2017, 1, 3), b'\x00\x01state'))
+        self.assertEqual(decode_cursor(encode_cursor(2017)), (2017, None))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_cursor('not a cursor')
+        with self.assertRaises(ValueError):
+            fetch_page(self.session, PreparedStatement(), ('sensor',), self.partitions, (0, 1), 4,
+                encode_cursor(date(2016, 1, 1)))
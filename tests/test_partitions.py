@@ -0,0 +1,110 @@
+import os
+import re
+import unittest
+
+from calendar import timegm
+from datetime import date, datetime
+
+from partitions import (GRANULARITIES, partition_end, partition_key, partition_keys, partition_settled_at,
+    partition_span)
+from statements import MEASUREMENT_TABLES
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'schema_development.cql')
+
+PARTITION_COLUMN_TYPES = {
+    'year': 'int',
+    'month_first_day': 'date',
+    'week_first_day': 'date',
+    'date': 'date',
+}
+
+
+def ms(*args):
+    return timegm(datetime(*args).utctimetuple()) * 1000
+
+def parse_schema_tables(path):
+    """{table: (column types, partition key columns, clustering columns)} for the tables
+    of a CQL dump declaring a composite partition key."""
+    with open(path) as f:
+        schema = f.read()
+
+    tables = {}
+    for match in re.finditer(r"CREATE TABLE \w+\.(\w+) \((.*?)\n\)", schema, re.S):
+        name, body = match.groups()
+        columns = dict(re.findall(r"^\s+(\w+) ([\w<>, ]+?)(?: static)?,$", body, re.M))
+        primary_key = re.search(r"PRIMARY KEY \(\((.*?)\)(.*?)\)$", body, re.M)
+        if primary_key is None:
+            continue
+        partition_key = [column.strip() for column in primary_key.group(1).split(',')]
+        clustering = [column.strip() for column in primary_key.group(2).split(',') if column.strip()]
+        tables[name] = (columns, partition_key, clustering)
+
+    return tables
+
+
+class PartitionKeysTests(unittest.TestCase):
+
+    def test_years(self):
+        self.assertEqual(partition_keys('year', ms(2015, 6, 1), ms(2017, 1, 1)), [2015, 2016, 2017])
+        self.assertEqual(partition_keys('year', ms(2016, 1, 1), ms(2016, 12, 31, 23, 59, 59)), [2016])
+        self.assertEqual(partition_keys('year', ms(2015, 6, 1), ms(2017, 1, 1), descending=True), [2017, 2016, 2015])
+
+    def test_months(self):
+        self.assertEqual(partition_keys('month_first_day', ms(2016, 11, 30, 23), ms(2017, 1, 1)),
+            [date(2016, 11, 1), date(2016, 12, 1), date(2017, 1, 1)])
+        self.assertEqual(partition_keys('month_first_day', ms(2017, 1, 31), ms(2017, 1, 31, 23, 59)),
+            [date(2017, 1, 1)])
+
+    def test_weeks_start_on_monday(self):
+        # 2019-01-01 is a Tuesday: its week starts on Monday 2018-12-31.
+        self.assertEqual(partition_keys('week_first_day', ms(2019, 1, 1), ms(2019, 1, 10)),
+            [date(2018, 12, 31), date(2019, 1, 7)])
+        self.assertEqual(partition_keys('week_first_day', ms(2017, 1, 1), ms(2017, 1, 2)),
+            [date(2016, 12, 26), date(2017, 1, 2)])
+
+    def test_days(self):
+        self.assertEqual(partition_keys('date', ms(2016, 2, 28, 12), ms(2016, 3, 1)),
+            [date(2016, 2, 28), date(2016, 2, 29), date(2016, 3, 1)])
+        self.assertEqual(partition_keys('date', ms(2016, 2, 28, 12), ms(2016, 2, 28, 23, 59, 59, 999000)),
+            [date(2016, 2, 28)])
+
+    def test_boundaries_are_utc(self):
+        self.assertEqual(partition_key('date', ms(2016, 12, 31, 23, 59, 59)), date(2016, 12, 31))
+        self.assertEqual(partition_key('year', ms(2016, 12, 31, 23, 59, 59)), 2016)
+        self.assertEqual(partition_key('year', ms(2017, 1, 1)), 2017)
+
+    def test_partition_end(self):
+        self.assertEqual(partition_end('year', ms(2016, 12, 31, 23, 59, 59)), datetime(2017, 1, 1))
+        self.assertEqual(partition_end('month_first_day', ms(2016, 2, 10)), datetime(2016, 3, 1))
+        self.assertEqual(partition_end('week_first_day', ms(2019, 1, 1)), datetime(2019, 1, 7))
+        self.assertEqual(partition_end('date', ms(2016, 2, 29)), datetime(2016, 3, 1))
+
+    def test_partition_settled_at(self):
+        # The daily row of Dec 31 is written on Jan 1, plus the ingestion lag.
+        settle_ms = (86400 + 3600) * 1000
+        self.assertEqual(partition_settled_at('year', ms(2016, 12, 31), settle_ms), datetime(2017, 1, 2, 1))
+        self.assertEqual(partition_settled_at('year', ms(2016, 12, 31), 0), partition_end('year', ms(2016, 12, 31)))
+
+    def test_partition_span(self):
+        self.assertEqual(partition_span('year', 2016), (ms(2016, 1, 1), ms(2017, 1, 1)))
+        self.assertEqual(partition_span('week_first_day', date(2018, 12, 31)), (ms(2018, 12, 31), ms(2019, 1, 7)))
+
+    def test_empty_range(self):
+        for column in GRANULARITIES:
+            self.assertEqual(partition_keys(column, ms(2017, 1, 2), ms(2017, 1, 1)), [])
+
+
+class MeasurementTableSchemaTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tables = parse_schema_tables(SCHEMA_FILE)
+
+    def test_partition_and_time_columns_match_schema(self):
+        for table in MEASUREMENT_TABLES.values():
+            self.assertIn(table.name, self.tables)
+            columns, partition_key, clustering = self.tables[table.name]
+
+            self.assertEqual(partition_key[-1], table.partition_column, table.name)
+            self.assertEqual(columns[table.partition_column], PARTITION_COLUMN_TYPES[table.partition_column], table.name)
+            self.assertEqual(clustering[0], table.time_column, table.name)
+            self.assertEqual(columns[table.time_column], 'timestamp', table.name)
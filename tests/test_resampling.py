@@ -0,0 +1,95 @@
+import unittest
+
+from datetime import datetime
+
+from cassandra.util import Date
+
+from resampling import MONDAY_MS, epoch_ms, parse_interval, resample, select_table
+from statements import GROUP_TABLES, SINGLE_PARAMETER_TABLES
+
+HOUR_MS = 3600000
+
+
+class ParseIntervalTests(unittest.TestCase):
+
+    def test_units(self):
+        self.assertEqual(parse_interval('90s'), 90)
+        self.assertEqual(parse_interval('30m'), 1800)
+        self.assertEqual(parse_interval('6h'), 21600)
+        self.assertEqual(parse_interval('1d'), 86400)
+        self.assertEqual(parse_interval('2W'), 1209600)
+
+    def test_invalid(self):
+        for value in (None, '', 'h', '0h', '1.5h', '3y', '-1d'):
+            with self.assertRaises(ValueError):
+                parse_interval(value)
+
+
+class SelectTableTests(unittest.TestCase):
+
+    def test_coarsest_dividing_resolution(self):
+        self.assertEqual(select_table(SINGLE_PARAMETER_TABLES, 7200).name, 'hourly_single_measurements_by_sensor')
+        self.assertEqual(select_table(SINGLE_PARAMETER_TABLES, 604800).name, 'daily_single_measurements_by_sensor')
+        self.assertEqual(select_table(GROUP_TABLES, 2700).name, 'fifteen_min_group_measurements_by_station')
+        self.assertEqual(select_table(GROUP_TABLES, 1500).name, 'five_min_group_measurements_by_station')
+        self.assertEqual(select_table(GROUP_TABLES, 7).name, 'one_sec_group_measurements_by_station')
+
+    def test_no_dividing_resolution(self):
+        self.assertIsNone(select_table(SINGLE_PARAMETER_TABLES[:2], 1800))
+
+    def test_only_stored_frequencies(self):
+        table = select_table(SINGLE_PARAMETER_TABLES, 86400, ['10 Min'])
+        self.assertEqual(table.name, 'ten_min_single_measurements_by_sensor')
+        self.assertEqual(select_table(GROUP_TABLES, 86400, ['5 Min', 'Hourly']).name,
+            'hourly_parameter_group_measurements_by_station')
+        self.assertIsNone(select_table(SINGLE_PARAMETER_TABLES, 1800, ['Hourly']))
+        # Unknown frequencies leave every table to choose from.
+        self.assertEqual(select_table(SINGLE_PARAMETER_TABLES, 86400, ['Unknown']).name,
+            'daily_single_measurements_by_sensor')
+
+
+class ResampleTests(unittest.TestCase):
+
+    def test_buckets(self):
+        timestamps = [0, HOUR_MS, 2 * HOUR_MS, 3 * HOUR_MS, 5 * HOUR_MS]
+        starts, lows, avgs, highs, rows = resample(
+            timestamps, [1.0, 0.5, 2.0, None, 4.0], [2.0, 4.0, 3.0, None, 5.0], [3.0, 6.0, 4.0, 9.0, 6.0],
+            2 * HOUR_MS)
+
+        self.assertEqual(starts, [0, 2 * HOUR_MS, 4 * HOUR_MS])
+        self.assertEqual(lows, [0.5, 2.0, 4.0])
+        self.assertEqual(avgs, [3.0, 3.0, 5.0])
+        self.assertEqual(highs, [6.0, 9.0, 6.0])
+        self.assertEqual(rows, [2, 1, 1])
+
+    def test_weights(self):
+        starts, lows, avgs, highs, rows = resample([0, HOUR_MS], [1.0, 1.0], [2.0, 5.0], [9.0, 9.0], 2 * HOUR_MS,
+            weights=[2, 1])
+
+        self.assertEqual(avgs, [3.0])
+
+    def test_bucket_without_averages(self):
+        starts, lows, avgs, highs, rows = resample([0], [None], [None], [1.0], HOUR_MS)
+
+        self.assertEqual((lows, avgs, highs, rows), ([None], [None], [1.0], [0]))
+
+    def test_weeks_start_on_monday(self):
+        week_ms = 7 * 24 * HOUR_MS
+        starts = resample([MONDAY_MS - 1, MONDAY_MS], [1.0, 1.0], [1.0, 1.0], [1.0, 1.0], week_ms)[0]
+
+        self.assertEqual(starts, [MONDAY_MS - week_ms, MONDAY_MS])
+        self.assertEqual(datetime.utcfromtimestamp(MONDAY_MS / 1000).weekday(), 0)
+
+    def test_empty(self):
+        self.assertEqual(resample([], [], [], [], HOUR_MS), ([], [], [], [], []))
+
+
+class EpochMsTests(unittest.TestCase):
+
+    def test_dates_and_datetimes(self):
+        self.assertEqual(epoch_ms(Date(1)), 86400000)
+        self.assertEqual(epoch_ms(datetime(1970, 1, 1, 1, 0, 0, 5000)), HOUR_MS + 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import uuid
+
+from collections import OrderedDict
+from datetime import datetime
+
+import serializers
+
+from serializers import MIMETYPE_ARROW, MIMETYPE_JSON, MIMETYPE_MSGPACK, available_mimetypes, encode, normalize_columns
+
+PARAMETER_ID = uuid.UUID('7bd5b1e5-1a1c-4f54-8f5a-2d1c6fd1b0a4')
+
+
+def columns():
+    return OrderedDict([
+        ('parameter_id', PARAMETER_ID),
+        ('unit', 'C'),
+        ('timestamp', [datetime(2017, 1, 1), datetime(2017, 1, 1, 0, 0, 1, 500000), None]),
+        ('avg_value', [1.5, None, 2.25]),
+    ])
+
+
+class SerializersTests(unittest.TestCase):
+
+    def test_normalize_columns(self):
+        data = normalize_columns({'series': columns()})
+
+        self.assertEqual(data['series']['timestamp'], [1483228800000, 1483228801500, None])
+        self.assertEqual(data['series']['avg_value'], [1.5, None, 2.25])
+
+    def test_json_is_always_available(self):
+        self.assertEqual(available_mimetypes()[0], MIMETYPE_JSON)
+
+    @unittest.skipIf(serializers.msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        data = serializers.msgpack.unpackb(encode(columns(), MIMETYPE_MSGPACK), raw=False)
+
+        self.assertEqual(data['parameter_id'], str(PARAMETER_ID))
+        self.assertEqual(data['timestamp'], [1483228800000, 1483228801500, None])
+        self.assertEqual(data['avg_value'], [1.5, None, 2.25])
+
+    @unittest.skipIf(serializers.pyarrow is None, "pyarrow is not installed")
+    def test_arrow(self):
+        pyarrow = serializers.pyarrow
+        reader = pyarrow.RecordBatchStreamReader(pyarrow.BufferReader(encode(columns(), MIMETYPE_ARROW)))
+        table = reader.read_all()
+
+        self.assertEqual(table.schema.field('timestamp').type, pyarrow.int64())
+        self.assertEqual(table.schema.field('avg_value').type, pyarrow.float32())
+        self.assertEqual(table.column('timestamp').to_pylist(), [1483228800000, 1483228801500, None])
+        self.assertEqual(table.column('avg_value').to_pylist(), [1.5, None, 2.25])
+        self.assertEqual(table.schema.metadata[b'unit'], b'"C"')
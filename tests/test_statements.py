@@ -0,0 +1,81 @@
+import unittest
+
+from statements import (DATA_SETS, MEASUREMENT_TABLES, RESOLUTIONS, StatementRegistry, build_registry,
+    normalize_data_sets, table_resolution)
+
+
+class FakeSession(object):
+
+    def __init__(self, broken_tables=()):
+        self.broken_tables = broken_tables
+        self.prepared = []
+
+    def prepare(self, query):
+        for table in self.broken_tables:
+            if " {} ".format(table) in query:
+                raise ValueError("unconfigured table {}".format(table))
+        self.prepared.append(query)
+        return query
+
+
+class StatementRegistryTests(unittest.TestCase):
+
+    def test_prepare_all_prepares_every_statement_once(self):
+        registry = build_registry()
+        session = FakeSession()
+
+        self.assertTrue(registry.prepare_all(session))
+        self.assertEqual(len(session.prepared), len(registry.queries))
+        self.assertEqual(registry.failures, {})
+
+    def test_lookup_by_variant(self):
+        registry = build_registry()
+        registry.prepare_all(FakeSession())
+
+        query = registry.get('one_sec_single_measurements_by_sensor', data_sets=('avg',), order='ASC')
+        self.assertIn("avg_value", query)
+        self.assertNotIn("min_value", query)
+        self.assertIn("ORDER BY timestamp ASC", query)
+
+        query = registry.get('daily_profile_measurements_by_sensor', data_sets=DATA_SETS, order='DESC')
+        self.assertIn("year=? AND date>=? AND", query)
+        self.assertIn("vertical_position", query)
+
+        self.assertIn("ORDER BY", registry.get('five_min_group_measurements_by_station', order='ASC'))
+        self.assertNotIn("ORDER BY", registry.get('five_min_group_measurements_by_station', order=None))
+        self.assertIn("LIMIT ?", registry.get('video_urls_by_station', order='DESC', limit=True))
+
+    def test_every_measurement_table_is_registered(self):
+        registry = build_registry()
+        names = set(name for name, variant in registry.queries)
+
+        self.assertTrue(set(MEASUREMENT_TABLES).issubset(names))
+
+    def test_failures_are_reported_at_prepare_time(self):
+        registry = build_registry()
+
+        self.assertFalse(registry.prepare_all(FakeSession(broken_tables=('stations',))))
+        self.assertEqual(list(registry.failures), [('stations', ())])
+        with self.assertRaises(KeyError):
+            registry.get('stations')
+        registry.get('sensors_by_station')
+
+    def test_unknown_statement(self):
+        registry = StatementRegistry()
+        registry.prepare_all(FakeSession())
+
+        with self.assertRaises(KeyError):
+            registry.get('stations')
+
+    def test_normalize_data_sets(self):
+        self.assertEqual(normalize_data_sets([]), DATA_SETS)
+        self.assertEqual(normalize_data_sets(['max', 'min']), ('min', 'max'))
+        self.assertEqual(normalize_data_sets(['bogus']), DATA_SETS)
+
+
+class TableResolutionTests(unittest.TestCase):
+
+    def test_every_measurement_table_has_a_resolution(self):
+        for table in MEASUREMENT_TABLES.values():
+            self.assertIn(table_resolution(table), RESOLUTIONS.values())
+        self.assertEqual(table_resolution(MEASUREMENT_TABLES['fifteen_min_group_meas_by_station_grouped']), 900)
@@ -0,0 +1,126 @@
+import unittest
+import uuid
+
+from datetime import datetime
+
+from config import Config
+from statements import MEASUREMENT_TABLES
+from streams import StreamHub
+
+KEY = (uuid.UUID(int=1), uuid.UUID(int=2), 0)
+TABLE = MEASUREMENT_TABLES['five_min_group_measurements_by_station']
+NOW = 1485000000    # 2017-01-21 12:00:00 UTC
+
+
+class InMemorySession(object):
+    """Stand-in for a Cassandra session over a list of group measurement rows."""
+
+    def __init__(self):
+        self.rows = []
+        self.executed = []
+
+    def execute(self, statement, parameters):
+        self.executed.append(parameters)
+        from_timestamp, to_timestamp = parameters[-2:]
+        return [row for row in self.rows
+            if from_timestamp <= (row['timestamp'] - datetime(1970, 1, 1)).total_seconds() * 1000 <= to_timestamp]
+
+
+class StreamHubTests(unittest.TestCase):
+
+    def setUp(self):
+        self.now = NOW
+        self.session = InMemorySession()
+        self.hub = StreamHub(self.session, queue_size=2, clock=lambda: self.now, threaded=False)
+
+    def add_row(self, minute, value, parameter_id=None):
+        self.session.rows.append(
+            {'timestamp': datetime(2017, 1, 21, 12, minute), 'parameter_id': parameter_id, 'avg_value': value})
+
+    def test_one_poller_fans_out_to_every_subscription(self):
+        subscriptions = [self.hub.subscribe(KEY, TABLE, 'statement') for _ in range(3)]
+        poller = subscriptions[0].poller
+
+        self.add_row(5, 1.5)
+        self.now += 600
+        self.assertEqual(poller.poll_once(), 1)
+        self.assertEqual(len(self.session.executed), 1)
+
+        messages = [subscription.get(0) for subscription in subscriptions]
+        self.assertEqual(len(set(id(message) for message in messages)), 1)
+        self.assertEqual(messages[0][0], 1485000300000)
+        self.assertIn('1.5', messages[0][1])
+
+    def test_only_newer_rows_are_published(self):
+        subscription = self.hub.subscribe(KEY, TABLE, 'statement')
+        self.add_row(5, 1.5)
+        self.now += 600
+        subscription.poller.poll_once()
+
+        self.assertEqual(subscription.poller.poll_once(), 0)
+        self.add_row(10, 2.5)
+        self.now += 60
+        self.assertEqual(subscription.poller.poll_once(), 1)
+        self.assertEqual(self.session.executed[-1][-2], 1485000600000)
+
+    def test_rows_written_after_their_timestamp_was_published(self):
+        self.hub.lag = 3600
+        subscription = self.hub.subscribe(KEY, TABLE, 'statement')
+        self.add_row(5, 1.5, parameter_id=1)
+        self.now += 600
+        self.assertEqual(subscription.poller.poll_once(), 1)
+
+        # Another parameter at the published timestamp, and a row written late.
+        self.add_row(5, 2.5, parameter_id=2)
+        self.add_row(1, 0.5, parameter_id=1)
+        self.now += 60
+        self.assertEqual(subscription.poller.poll_once(), 2)
+        self.assertEqual(subscription.poller.poll_once(), 0)
+
+        subscription.get(0)
+        last_timestamp, data = subscription.get(0)
+        self.assertEqual(last_timestamp, 1485000300000)
+        self.assertIn('2.5', data)
+        self.assertIn('0.5', data)
+        self.assertNotIn('1.5', data)
+
+    def test_slow_subscription_is_closed(self):
+        subscription = self.hub.subscribe(KEY, TABLE, 'statement')
+        for minute in range(3):
+            self.add_row(minute + 1, float(minute))
+            self.now += 60
+            subscription.poller.poll_once()
+
+        self.assertTrue(subscription.closed)
+
+    def test_poller_stops_with_its_last_subscription(self):
+        first = self.hub.subscribe(KEY, TABLE, 'statement')
+        second = self.hub.subscribe(KEY, TABLE, 'statement')
+        self.assertIs(first.poller, second.poller)
+        self.assertEqual(self.hub.stats(), {'pollers': 1, 'subscriptions': 2, 'max_subscriptions': None, 'refused': 0})
+
+        self.hub.unsubscribe(first)
+        self.hub.unsubscribe(second)
+        self.assertEqual(self.hub.stats(), {'pollers': 0, 'subscriptions': 0, 'max_subscriptions': None, 'refused': 0})
+        self.assertTrue(first.poller._stopped.is_set())
+
+    def test_subscriptions_beyond_the_limit_are_refused(self):
+        self.hub.max_subscriptions = 2
+        first = self.hub.subscribe(KEY, TABLE, 'statement')
+        self.assertIsNotNone(self.hub.subscribe(KEY, TABLE, 'statement'))
+        self.assertIsNone(self.hub.subscribe(KEY, TABLE, 'statement'))
+
+        self.hub.unsubscribe(first)
+        self.hub.unsubscribe(first)
+        self.assertIsNotNone(self.hub.subscribe(KEY, TABLE, 'statement'))
+        self.assertEqual(self.hub.stats()['refused'], 1)
+
+    def test_default_limit_serves_streams(self):
+        self.hub.max_subscriptions = Config.STREAM_MAX_SUBSCRIPTIONS
+        for _ in range(Config.STREAM_MAX_SUBSCRIPTIONS):
+            self.assertIsNotNone(self.hub.subscribe(KEY, TABLE, 'statement'))
+        self.assertIsNone(self.hub.subscribe(KEY, TABLE, 'statement'))
+
+
+if __name__ == '__main__':
+    unittest.main()
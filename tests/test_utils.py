@@ -0,0 +1,82 @@
+import json
+import pytz
+import unittest
+import uuid
+
+from datetime import datetime
+
+import cassandra.cqltypes
+
+from cassandra.util import Date, OrderedMapSerializedKey, SortedSet
+
+from cassandra_udts import Averages, Position
+from statements import MEASUREMENT_TABLES, sensor_measurements_columns
+from utils import CustomEncoder, FastEncoder, image_mimetype, to_columnar
+
+
+class ToColumnarTests(unittest.TestCase):
+
+    def test_transposes_rows_across_result_sets(self):
+        table = MEASUREMENT_TABLES['ten_min_profile_measurements_by_sensor']
+        columns = sensor_measurements_columns(table, ('avg', 'max'))
+        self.assertEqual(columns, ['sensor_id', 'parameter_id', 'qc_level', 'month_first_day', 'timestamp',
+            'vertical_position', 'unit', 'avg_value', 'max_value'])
+
+        result_sets = [
+            [('s', 'p', 1, 'm1', 10, 0.5, 'C', 1.0, 2.0), ('s', 'p', 1, 'm1', 20, 0.5, 'C', 1.5, 2.5)],
+            [],
+            [('s', 'p', 1, 'm2', 30, 1.0, 'C', None, 3.0)],
+        ]
+        data = to_columnar(columns, result_sets, ('sensor_id', 'parameter_id', 'qc_level', 'unit'),
+            ('month_first_day',))
+
+        self.assertEqual(list(data.keys()), ['sensor_id', 'parameter_id', 'qc_level', 'unit', 'timestamp',
+            'vertical_position', 'avg_value', 'max_value'])
+        self.assertEqual(data['unit'], 'C')
+        self.assertEqual(data['timestamp'], [10, 20, 30])
+        self.assertEqual(data['avg_value'], [1.0, 1.5, None])
+        self.assertEqual(data['max_value'], [2.0, 2.5, 3.0])
+
+    def test_empty_results(self):
+        data = to_columnar(['sensor_id', 'timestamp'], [[]], ('sensor_id',))
+
+        self.assertEqual(data, {'sensor_id': None, 'timestamp': []})
+
+
+class FastEncoderTests(unittest.TestCase):
+
+    def test_matches_custom_encoder(self):
+        values = [
+            uuid.UUID('7bd5b1e5-1a1c-4f54-8f5a-2d1c6fd1b0a4'),
+            OrderedMapSerializedKey(cassandra.cqltypes.UTF8Type, 3),
+            SortedSet([3, 1, 2]),
+            Date(17167),
+            b'\x00\xff',
+            Averages(1.0, 2.0, 3.0, 'C'),
+            Position(57.7, 11.9),
+        ]
+        values[1]._insert('a', 1)
+
+        self.assertEqual(json.dumps(values, cls=FastEncoder), json.dumps(values, cls=CustomEncoder))
+
+    def test_datetimes_are_integer_epoch_milliseconds(self):
+        self.assertEqual(json.dumps(datetime(2017, 1, 1, 0, 0, 1, 500999), cls=FastEncoder), '1483228801500')
+        self.assertEqual(json.dumps(datetime(2017, 1, 1, 1, tzinfo=pytz.timezone('Etc/GMT-1')), cls=FastEncoder),
+            '1483228800000')
+
+    def test_subclasses_and_unknown_types(self):
+        class StationId(uuid.UUID):
+            pass
+
+        self.assertEqual(json.dumps(StationId(int=1), cls=FastEncoder), '"00000000-0000-0000-0000-000000000001"')
+        self.assertEqual(json.dumps(object(), cls=FastEncoder), 'null')
+
+
+class ImageMimetypeTests(unittest.TestCase):
+
+    def test_signatures(self):
+        self.assertEqual(image_mimetype(b'\xff\xd8\xff\xe0\x00\x10JFIF'), 'image/jpeg')
+        self.assertEqual(image_mimetype(b'\x89PNG\r\n\x1a\n\x00'), 'image/png')
+        self.assertEqual(image_mimetype(b'GIF89a\x01\x00'), 'image/gif')
+        self.assertEqual(image_mimetype(b'RIFF\x24\x00\x00\x00WEBPVP8 '), 'image/webp')
+        self.assertEqual(image_mimetype(b'plain'), 'application/octet-stream')
@@ -1,4 +1,5 @@
 import calendar
+import hashlib
 import json
 import pytz
 import time
@@ -30,6 +31,57 @@ def make_timestamp_range(from_ts, to_ts):
     
     return Timerange(from_timestamp=from_timestamp, to_timestamp=to_timestamp)
 
+def request_etag(*parts):
+    """Strong ETag value identifying a response by the request that produced it."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def to_columnar(column_names, result_sets, constant_columns=(), omitted_columns=()):
+    """Transpose tuple rows into one list per column.
+
+    Columns in ``constant_columns`` hold the same value on every row and are
+    returned once, taken from the first row; ``omitted_columns`` are dropped.
+    """
+    data = OrderedDict((name, None) for name in constant_columns)
+    arrays = OrderedDict(
+        (index, []) for index, name in enumerate(column_names)
+            if name not in constant_columns and name not in omitted_columns)
+    constants = [(index, name) for index, name in enumerate(column_names) if name in constant_columns]
+    
+    first = True
+    for rows in result_sets:
+        rows = list(rows)
+        if not rows:
+            continue
+        if first:
+            for index, name in constants:
+                data[name] = rows[0][index]
+            first = False
+        columns = list(zip(*rows))
+        for index, values in arrays.items():
+            values.extend(columns[index])
+    
+    for index, values in arrays.items():
+        data[column_names[index]] = values
+    
+    return data
+
+def iter_json_array(result_sets, cls=json.JSONEncoder):
+    """Encode rows of consecutive result sets as one JSON array, one chunk per result set."""
+    encoder = cls()
+    separator = ''
+    
+    yield '['
+    for rows in result_sets:
+        chunk = encoder.encode(list(rows))[1:-1]
+        if chunk:
+            yield separator + chunk
+            separator = ','
+    yield ']'
+
 class CustomEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, OrderedMapSerializedKey):
@@ -65,3 +117,91 @@ class CustomEncoder(json.JSONEncoder):
             }
         elif isinstance(obj, SortedSet):
             return [i for i in obj]
+
+EPOCH = datetime(1970, 1, 1)
+
+# Bounded: ids repeat across rows and requests, but a long running worker
+# should not keep every id it has ever seen.
+UUID_STRINGS_MAX_SIZE = 65536
+uuid_strings = {}
+
+def uuid_to_str(obj):
+    try:
+        return uuid_strings[obj]
+    except KeyError:
+        if len(uuid_strings) >= UUID_STRINGS_MAX_SIZE:
+            uuid_strings.clear()
+        value = uuid_strings[obj] = str(obj)
+        return value
+
+def datetime_to_epoch_ms(obj):
+    if obj.tzinfo is not None:
+        obj = obj.replace(tzinfo=None) - obj.utcoffset()
+    delta = obj - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+def b64_str(obj):
+    return b64encode(obj).decode('utf-8')
+
+def str_keys(obj):
+    return {str(k):v for k,v in obj.items()}
+
+class FastEncoder(CustomEncoder):
+    """CustomEncoder dispatching on the exact type of a value.
+
+    Produces the same output as CustomEncoder, except that datetimes are
+    encoded as integer epoch milliseconds rather than whole seconds times
+    1e3. Subclasses of the known types are resolved once through their MRO.
+    """
+    handlers = {
+        uuid.UUID: uuid_to_str,
+        datetime: datetime_to_epoch_ms,
+        OrderedMapSerializedKey: str_keys,
+        OrderedDict: str_keys,
+        Date: lambda obj: obj.seconds,
+        bytes: b64_str,
+        SortedSet: list,
+        Averages: lambda obj: {'min_value': obj.min_value, 'avg_value': obj.avg_value,
+            'max_value': obj.max_value, 'unit': obj.unit},
+        Description: lambda obj: {'short_description': obj.short_description,
+            'long_description': obj.long_description},
+        Livewebcam: lambda obj: {'url': obj.url, 'ip_address': obj.ip_address},
+        Position: lambda obj: {'latitude': obj.latitude, 'longitude': obj.longitude},
+        Thumbnails: lambda obj: {'xl': b64_str(obj.xl), 'l': b64_str(obj.l), 'm': b64_str(obj.m), 's': b64_str(obj.s)},
+    }
+
+    def default(self, obj):
+        try:
+            handler = self.handlers[obj.__class__]
+        except KeyError:
+            handler = self.resolve(obj.__class__)
+        if handler is None:
+            return CustomEncoder.default(self, obj)
+        return handler(obj)
+
+    @classmethod
+    def resolve(cls, type_):
+        handler = None
+        for base in type_.__mro__[1:]:
+            if base in cls.handlers:
+                handler = cls.handlers[base]
+                break
+        cls.handlers[type_] = handler
+        return handler
+
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+def image_mimetype(data):
+    """Mimetype of the image ``data`` from its leading bytes, application/octet-stream when unknown."""
+    for signature, mimetype in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mimetype
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    
+    return 'application/octet-stream'